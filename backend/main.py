@@ -1,19 +1,33 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, PlainTextResponse
+from fastapi.responses import StreamingResponse, PlainTextResponse, Response, FileResponse
 import pandas as pd
 import numpy as np
-import io
+import os
 import json
+import gzip
+import hashlib
+import tempfile
+import asyncio
 import logging
 from datetime import datetime
 from typing import List, Dict, Any, Optional
+from urllib.parse import quote
 
 from .services.data_processor import DataProcessor
 from .services.ai_analyzer import AIAnalyzer
 from .services.chart_generator import ChartGenerator
-from .services.export_service import ExportService
-from .models.schemas import ChartData, ExportRequest, ChartRecommendation
+from .services.export_service import ExportService, ExportDependencyError, REPORT_FORMATS
+from .services.render_pool import RenderPool, RenderQueueFullError, RenderTimeoutError
+from .services.dataset_store import DatasetStore
+from .services.export_jobs import ExportJobQueue
+from .services.embed_store import EmbedStore
+from .services.dataset_export import DatasetExporter, DATASET_EXPORT_FORMATS
+from .services.thumbnails import ThumbnailService, THUMBNAIL_FORMATS
+from .services.cache import LRUCache, ArtifactCache
+from .services.config_diff import merge_patch_diff, MERGE_PATCH_MEDIA_TYPE
+from .services.serialization import FastJSONResponse, dumps, loads
+from .models.schemas import LightExportRequest, ExportOptions, EmbedMode
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -41,7 +55,34 @@ app.add_middleware(
 data_processor = DataProcessor()
 ai_analyzer = AIAnalyzer()
 chart_generator = ChartGenerator()
-export_service = ExportService()
+render_pool = RenderPool()
+export_service = ExportService(render_pool=render_pool)
+dataset_store = DatasetStore()
+dataset_exporter = DatasetExporter()
+thumbnail_service = ThumbnailService(chart_generator, render_pool)
+
+# 导出文件缓存，设置EXPORT_CACHE_DIR时启用磁盘层
+artifact_cache = ArtifactCache(disk_dir=os.getenv("EXPORT_CACHE_DIR") or None)
+
+# 后台导出任务队列
+export_jobs = ExportJobQueue(
+    handler=lambda job: _run_export_job(job),
+    workers=int(os.getenv("EXPORT_JOB_WORKERS", "2")),
+    ttl_seconds=float(os.getenv("EXPORT_JOB_TTL", "3600"))
+)
+
+# 托管嵌入图表的配置，设置EMBED_STORE_DIR时持久化到磁盘
+embed_store = EmbedStore(disk_dir=os.getenv("EMBED_STORE_DIR") or None)
+
+# 嵌入代码中使用的对外访问地址，部署在反向代理之后时需要设置
+PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL")
+
+# 嵌入内容按ID不可变；持久化存储时嵌入不会失效，可以永久缓存，
+# 只保存在内存中时嵌入可能被淘汰，只缓存一小时
+EMBED_CACHE_CONTROL = "public, max-age=31536000, immutable" if embed_store.persistent else "public, max-age=3600"
+
+# 已下发给客户端的图表配置版本（ETag -> 配置），用于计算增量补丁
+config_versions = LRUCache(max_entries=512)
 
 @app.get("/")
 async def root():
@@ -60,6 +101,9 @@ async def root():
         "endpoints": {
             "upload": "/upload - 上传并处理文件",
             "export": "/export - 导出图表",
+            "recommendations_stream": "/recommendations/stream - 流式AI图表推荐(SSE)",
+            "dataset_recommendations": "/datasets/{dataset_id}/recommendations - 查询后台图表推荐结果",
+            "embed": "/embed/{embed_id} - 托管的图表嵌入页面",
             "health": "/health - 健康检查"
         }
     }
@@ -75,9 +119,22 @@ async def health_check():
             "ai_analyzer": "ok", 
             "chart_generator": "ok",
             "export_service": "ok"
-        }
+        },
+        "caches": {
+            "chart_config": chart_generator.config_cache.stats(),
+            "export_artifacts": artifact_cache.stats(),
+            "embeds": embed_store.stats()
+        },
+        "render_pool": render_pool.stats(),
+        "export_jobs": export_jobs.stats()
     }
 
+@app.on_event("shutdown")
+async def shutdown_render_pool():
+    """关闭光栅化进程池和导出任务队列"""
+    export_jobs.shutdown()
+    render_pool.shutdown()
+
 @app.post("/upload")
 async def upload_file(file: UploadFile = File(...)):
     """
@@ -120,27 +177,36 @@ async def upload_file(file: UploadFile = File(...)):
         logger.info("开始清洗数据...")
         cleaned_df, columns_info = await data_processor.clean_data(df, header_analysis)
         
-        # Step 3: AI图表推荐
-        logger.info("开始AI图表推荐...")
-        recommendations = await ai_analyzer.recommend_charts(cleaned_df, columns_info)
+        # Step 3: 保存数据集，AI图表推荐在后台进行
+        metadata = {
+            "original_filename": file.filename,
+            "rows_count": len(cleaned_df),
+            "columns_count": len(columns_info),
+            "file_size": file.size,
+            "processing_time": datetime.now().isoformat(),
+            "issues_found": header_analysis.get("issues", [])
+        }
+        dataset_id = dataset_store.add(cleaned_df, columns_info, metadata)
+        job = dataset_store.get_recommendation_job(dataset_id)
+        job.task = asyncio.create_task(_run_recommendation_job(dataset_id))
         
         # Step 4: 准备返回数据
         result_data = {
-            "recommendations": recommendations,
+            "dataset_id": dataset_id,
+            "recommendations": [],
+            "recommendation_job": {
+                "id": job.id,
+                "status": job.status,
+                "poll_url": f"/datasets/{dataset_id}/recommendations",
+                "stream_url": f"/datasets/{dataset_id}/recommendations/stream"
+            },
             "data": cleaned_df.to_dict('records'),
             "columns": columns_info,
-            "metadata": {
-                "original_filename": file.filename,
-                "rows_count": len(cleaned_df),
-                "columns_count": len(columns_info),
-                "file_size": file.size,
-                "processing_time": datetime.now().isoformat(),
-                "issues_found": header_analysis.get("issues", [])
-            }
+            "metadata": metadata
         }
         
-        logger.info(f"文件处理完成，生成{len(recommendations)}个图表推荐")
-        return result_data
+        logger.info(f"文件处理完成，数据集ID: {dataset_id}，图表推荐已在后台启动")
+        return FastJSONResponse(result_data)
         
     except HTTPException:
         raise
@@ -148,59 +214,519 @@ async def upload_file(file: UploadFile = File(...)):
         logger.error(f"文件处理失败: {str(e)}")
         raise HTTPException(status_code=500, detail=f"文件处理失败: {str(e)}")
 
+async def _run_recommendation_job(dataset_id: str):
+    """后台执行AI图表推荐，为每个推荐并行预生成图表配置后推送给推荐任务"""
+    dataset = dataset_store.get(dataset_id)
+    if dataset is None:
+        return
+    job = dataset["recommendation_job"]
+    
+    async def attach_config(rec: Dict):
+        try:
+            rec["config"] = await _get_dataset_chart_config(dataset_id, rec["chart"])
+        except Exception as e:
+            logger.error(f"预生成{rec['chart']}配置失败: {str(e)}")
+            rec["config"] = None
+        # 缩略图在后台生成，不阻塞推荐推送
+        if rec["chart"] in chart_generator.supported_charts:
+            thumbnail_service.schedule(dataset, rec["chart"])
+            rec["thumbnail_url"] = f"/datasets/{dataset_id}/thumbnail?chart_type={quote(rec['chart'])}"
+        await job.add_recommendation(rec)
+    
+    try:
+        logger.info(f"开始AI图表推荐，数据集ID: {dataset_id}")
+        config_tasks = []
+        async for rec in ai_analyzer.stream_recommendations(dataset["df"], dataset["columns"]):
+            config_tasks.append(asyncio.create_task(attach_config(rec)))
+        await asyncio.gather(*config_tasks)
+        await job.complete()
+        logger.info(f"AI图表推荐完成，数据集ID: {dataset_id}，生成{len(job.recommendations)}个图表推荐")
+        
+    except asyncio.CancelledError:
+        # 数据集被淘汰时任务被取消，通知订阅者结束等待
+        await job.fail("数据集已过期，图表推荐已取消")
+        raise
+    except Exception as e:
+        logger.error(f"AI图表推荐任务失败: {str(e)}")
+        await job.fail(str(e))
+
+async def _get_dataset_chart_config(dataset_id: str, chart_type: str, options: Dict = None) -> Dict:
+    """获取数据集的图表配置，在线程池中生成（数据层按数据集ID缓存）"""
+    dataset = dataset_store.get(dataset_id)
+    if dataset is None:
+        raise HTTPException(status_code=404, detail="数据集不存在或已过期")
+    
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None,
+        lambda: chart_generator.generate_config(
+            chart_type,
+            dataset["df"],
+            dataset["columns"],
+            options or {},
+            dataset_key=dataset_id
+        )
+    )
+
+@app.get("/datasets/{dataset_id}/recommendations")
+async def get_recommendations(dataset_id: str):
+    """轮询数据集的AI图表推荐任务状态"""
+    job = dataset_store.get_recommendation_job(dataset_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="数据集不存在或已过期")
+    return FastJSONResponse(job.to_dict())
+
+@app.get("/datasets/{dataset_id}/recommendations/stream")
+async def stream_dataset_recommendations(dataset_id: str):
+    """
+    以Server-Sent Events推送数据集的AI图表推荐
+    
+    事件类型：
+    - recommendation: 单个图表推荐
+    - done: 推荐任务完成，包含全部推荐
+    - error: 推荐任务失败
+    """
+    job = dataset_store.get_recommendation_job(dataset_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="数据集不存在或已过期")
+    
+    async def event_stream():
+        async for event, data in job.events():
+            yield _sse_event(event, data)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.post("/export")
-async def export_chart(request: ExportRequest):
+async def export_chart(raw_request: Request):
     """
     导出图表
     
+    请求体与ExportRequest相同，也可用dataset_id代替chart_data中的数据（此时可用chart_type指定图表类型）。
+    只校验格式、选项和列信息，数据行（行列表或{列名: 数组}）不做逐行校验。
+    
+    图片和文档格式按(图表配置, 格式, 选项)的内容哈希缓存，响应头ETag即该哈希，
+    请求头If-None-Match匹配时返回304。耗时较长的导出建议使用/export/jobs。
+    
     支持的导出格式：
     - PNG: 高质量位图
     - SVG: 矢量图形
     - PDF: PDF文档
     - Markdown: 包含base64图片的Markdown
-    - iframe: HTML嵌入代码
+    - iframe: HTML嵌入代码（默认引用托管的/embed页面，options.embed_mode为inline时内联配置）
     - PowerPoint: PPT文件
     """
+    request, data = _parse_export_request(await _read_json_body(raw_request))
+    
     try:
         logger.info(f"开始导出图表，格式: {request.format}")
-        
-        # 生成图表配置
-        chart_config = chart_generator.generate_config(
-            request.chart_data.recommendations[0].chart,
-            request.chart_data.data,
-            request.chart_data.columns,
-            request.options.__dict__ if hasattr(request.options, '__dict__') else {}
-        )
+        chart_config = await _build_export_config(request, data)
         
         # 根据格式导出
         if request.format in ['markdown', 'iframe']:
             # 返回文本内容
-            result = await export_service.export_text(
-                chart_config, 
-                request.format, 
-                request.options
-            )
+            result = await _export_text(request, chart_config, str(raw_request.base_url))
             return PlainTextResponse(content=result)
-        else:
-            # 返回二进制文件
-            file_content, mime_type = await export_service.export_binary(
-                chart_config,
-                request.format, 
-                request.options
-            )
-            
-            filename = f"chart.{request.format}"
-            
+        
+        etag = artifact_cache.make_key(chart_config, request.format, request.options.model_dump(mode='json'))
+        headers = {
+            "ETag": f'"{etag}"',
+            "Cache-Control": "no-cache",
+            "Content-Disposition": f"attachment; filename=chart.{request.format}"
+        }
+        if _etag_matches(raw_request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        
+        cached = artifact_cache.get(etag)
+        if cached is not None:
+            file_content, mime_type = cached
+            return Response(content=file_content, media_type=mime_type, headers=headers)
+        
+        if request.format == 'svg':
+            # SVG逐段生成并流式返回，完整生成后写入缓存
             return StreamingResponse(
-                io.BytesIO(file_content),
-                media_type=mime_type,
-                headers={"Content-Disposition": f"attachment; filename={filename}"}
+                _cache_stream(etag, 'image/svg+xml', export_service.stream_svg(chart_config, request.options)),
+                media_type='image/svg+xml',
+                headers=headers
             )
+        
+        # 返回二进制文件
+        file_content, mime_type = await _export_binary_cached(etag, chart_config, request)
+        
+        return Response(content=file_content, media_type=mime_type, headers=headers)
             
+    except HTTPException:
+        raise
+    except RenderQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except RenderTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         logger.error(f"导出失败: {str(e)}")
         raise HTTPException(status_code=500, detail=f"导出失败: {str(e)}")
 
+async def _export_text(request: LightExportRequest, chart_config: Dict, base_url: str) -> str:
+    """导出markdown或iframe，托管嵌入模式下先保存图表配置"""
+    embed_url = None
+    if request.format == 'iframe' and request.options.embed_mode == EmbedMode.HOSTED:
+        loop = asyncio.get_running_loop()
+        embed_id = await loop.run_in_executor(None, embed_store.add, chart_config)
+        embed_url = f"{(PUBLIC_BASE_URL or base_url).rstrip('/')}/embed/{embed_id}"
+    return await export_service.export_text(chart_config, request.format, request.options, embed_url=embed_url)
+
+async def _read_json_body(raw_request: Request) -> Any:
+    """解析JSON请求体，格式错误时返回422"""
+    try:
+        return loads(await raw_request.body())
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"请求体不是合法的JSON: {str(e)}")
+
+def _parse_export_request(payload: Any):
+    """解析导出请求，只校验元数据字段"""
+    try:
+        return LightExportRequest.from_payload(payload)
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"导出请求格式错误: {str(e)}")
+
+async def _build_export_config(request: LightExportRequest, data: Any) -> Dict:
+    """生成导出所用的图表配置（在线程池中执行）"""
+    if request.dataset_id:
+        dataset = dataset_store.get(request.dataset_id)
+        if dataset is None:
+            raise HTTPException(status_code=404, detail="数据集不存在或已过期")
+        data = dataset["df"]
+        columns = dataset["columns"]
+    else:
+        columns = [col.model_dump(mode='json') for col in request.chart_data.columns]
+    
+    chart_type = request.chart
+    if not chart_type:
+        raise HTTPException(status_code=400, detail="未指定图表类型")
+    
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None,
+        lambda: chart_generator.generate_config(
+            chart_type,
+            data,
+            columns,
+            request.options.model_dump(mode='json', exclude_none=True),
+            dataset_key=request.dataset_id
+        )
+    )
+
+async def _export_binary_cached(etag: str, chart_config: Dict, request: LightExportRequest):
+    """导出二进制文件并写入导出缓存"""
+    file_content, mime_type = await export_service.export_binary(
+        chart_config,
+        request.format, 
+        request.options
+    )
+    if request.format != 'png' or render_pool.available:
+        # 未安装光栅化依赖时的占位图片不缓存
+        artifact_cache.set(etag, file_content, mime_type)
+    return file_content, mime_type
+
+@app.post("/export/report")
+async def export_report(request: Dict[str, Any]):
+    """
+    将多个图表导出为一个PDF或PPTX报告（流式返回）
+    
+    请求体：
+    - dataset_id: 已上传数据集ID（与data/columns二选一）
+    - data/columns: 数据和列信息
+    - charts: [{"chartType": "柱状图", "options": {...}}, ...]，使用dataset_id时可省略，默认导出全部推荐图表
+    - format: pdf或pptx
+    - options: 导出选项（width、height、dpi）
+    """
+    format_type, options = _parse_report_request(request)
+    
+    try:
+        path = await _build_report(request, format_type, options)
+        
+    except HTTPException:
+        raise
+    except ExportDependencyError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except RenderQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except RenderTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"导出报告失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"导出报告失败: {str(e)}")
+    
+    return StreamingResponse(
+        _stream_file(path),
+        media_type=REPORT_FORMATS[format_type],
+        headers={
+            "Content-Disposition": f"attachment; filename=report.{format_type}",
+            "Content-Length": str(os.path.getsize(path))
+        }
+    )
+
+def _parse_report_request(request: Dict[str, Any]):
+    """校验报告格式和导出选项"""
+    format_type = request.get("format", "pdf")
+    if format_type not in REPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"不支持的报告格式: {format_type}，支持: {', '.join(REPORT_FORMATS)}")
+    
+    try:
+        options = ExportOptions.model_validate({**(request.get("options") or {}), "format": format_type})
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"导出选项格式错误: {str(e)}")
+    
+    return format_type, options
+
+async def _build_report(request: Dict[str, Any], format_type: str, options: ExportOptions) -> str:
+    """生成报告中各图表的配置并导出为临时文件，返回文件路径"""
+    dataset_id = request.get("dataset_id")
+    chart_specs = request.get("charts") or []
+    if dataset_id:
+        dataset = dataset_store.get(dataset_id)
+        if dataset is None:
+            raise HTTPException(status_code=404, detail="数据集不存在或已过期")
+        data = dataset["df"]
+        columns = dataset["columns"]
+        if not chart_specs:
+            job = await _wait_recommendation_job(dataset["recommendation_job"])
+            chart_specs = [{"chartType": rec["chart"]} for rec in job.recommendations]
+    else:
+        data = request.get("data", [])
+        columns = request.get("columns", [])
+    
+    if not chart_specs:
+        raise HTTPException(status_code=400, detail="charts不能为空")
+    
+    # 未指定标题时以图表类型作为每页标题
+    chart_specs = [
+        {**spec, "options": {"title": spec.get("chartType"), **(spec.get("options") or {})}}
+        for spec in chart_specs
+    ]
+    
+    loop = asyncio.get_running_loop()
+    results = await loop.run_in_executor(
+        None,
+        lambda: chart_generator.generate_configs(chart_specs, data, columns, dataset_key=dataset_id)
+    )
+    for result in results:
+        if "error" in result:
+            logger.warning(f"报告中的图表生成失败（{result['chartType']}）: {result['error']}")
+    chart_configs = [result["config"] for result in results if "config" in result]
+    if not chart_configs:
+        raise HTTPException(status_code=400, detail="没有可导出的图表")
+    
+    return await export_service.export_report(chart_configs, format_type, options)
+
+async def _wait_recommendation_job(job, timeout: float = 120):
+    """等待数据集的推荐任务结束，超时或失败时返回409"""
+    if not job.finished:
+        if job.task is None:
+            raise HTTPException(status_code=409, detail="图表推荐尚未开始，请稍后重试或指定charts")
+        # asyncio.wait不会取消推荐任务
+        await asyncio.wait({job.task}, timeout=timeout)
+        if not job.finished:
+            raise HTTPException(status_code=409, detail="图表推荐尚未完成，请稍后重试或指定charts")
+    if job.status == "failed":
+        raise HTTPException(status_code=409, detail=f"图表推荐失败，请指定charts: {job.error}")
+    return job
+
+@app.post("/export/jobs", status_code=202)
+async def submit_export_job(raw_request: Request):
+    """
+    提交后台导出任务，适用于报告、高DPI图片等耗时较长的导出
+    
+    请求体：
+    - type: chart（单个图表，其余字段同/export）或report（报告，其余字段同/export/report）
+    
+    相同内容的任务在未过期前复用同一个任务。返回任务信息及状态、事件流和下载地址。
+    """
+    payload = await _read_json_body(raw_request)
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=422, detail="请求体必须是JSON对象")
+    
+    kind = payload.get("type", "chart")
+    if kind == "chart":
+        request, _ = _parse_export_request(payload)
+        format_type = request.format.value
+    elif kind == "report":
+        format_type, _ = _parse_report_request(payload)
+    else:
+        raise HTTPException(status_code=400, detail=f"不支持的导出任务类型: {kind}")
+    
+    key = hashlib.sha256(dumps(payload, sort_keys=True)).hexdigest()
+    # 托管嵌入代码需要对外访问地址
+    payload["_base_url"] = str(raw_request.base_url)
+    try:
+        job = export_jobs.submit(key, kind, format_type, payload)
+    except OverflowError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    return FastJSONResponse(_export_job_response(job), status_code=202)
+
+@app.get("/export/jobs/{job_id}")
+async def get_export_job(job_id: str):
+    """轮询导出任务状态"""
+    job = export_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="导出任务不存在或已过期")
+    return FastJSONResponse(_export_job_response(job))
+
+@app.get("/export/jobs/{job_id}/stream")
+async def stream_export_job(job_id: str):
+    """
+    以Server-Sent Events推送导出任务状态
+    
+    事件类型：
+    - status: 任务开始执行
+    - done: 任务完成，可以下载
+    - error: 任务失败
+    """
+    job = export_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="导出任务不存在或已过期")
+    
+    async def event_stream():
+        async for event, data in job.events():
+            yield _sse_event(event, {**data, "download_url": f"/export/jobs/{job.id}/download"} if event == "done" else data)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/export/jobs/{job_id}/download")
+async def download_export_job(job_id: str):
+    """下载已完成的导出任务文件"""
+    job = export_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="导出任务不存在或已过期")
+    if job.status == "failed":
+        raise HTTPException(status_code=409, detail=f"导出任务失败: {job.error}")
+    if job.status != "completed" or not job.path:
+        raise HTTPException(status_code=409, detail="导出任务尚未完成")
+    
+    return FileResponse(job.path, media_type=job.mime_type, filename=job.filename)
+
+def _export_job_response(job) -> Dict:
+    return {
+        **job.to_dict(),
+        "status_url": f"/export/jobs/{job.id}",
+        "stream_url": f"/export/jobs/{job.id}/stream",
+        "download_url": f"/export/jobs/{job.id}/download"
+    }
+
+async def _run_export_job(job) -> tuple:
+    """执行导出任务，返回(文件路径, MIME类型, 文件名)"""
+    if job.kind == "report":
+        format_type, options = _parse_report_request(job.payload)
+        try:
+            path = await _build_report(job.payload, format_type, options)
+        except ExportDependencyError as e:
+            raise HTTPException(status_code=501, detail=str(e))
+        return path, REPORT_FORMATS[format_type], f"report.{format_type}"
+    
+    request, data = _parse_export_request(job.payload)
+    chart_config = await _build_export_config(request, data)
+    if request.format in ['markdown', 'iframe']:
+        result = await _export_text(request, chart_config, job.payload.get("_base_url", ""))
+        file_content = result.encode('utf-8')
+        mime_type = 'text/markdown; charset=utf-8' if request.format == 'markdown' else 'text/html; charset=utf-8'
+        extension = 'md' if request.format == 'markdown' else 'html'
+    else:
+        etag = artifact_cache.make_key(chart_config, request.format, request.options.model_dump(mode='json'))
+        cached = artifact_cache.get(etag)
+        if cached is not None:
+            file_content, mime_type = cached
+        else:
+            file_content, mime_type = await _export_binary_cached(etag, chart_config, request)
+        extension = request.format.value
+    
+    fd, path = tempfile.mkstemp(suffix=f".{extension}")
+    with os.fdopen(fd, "wb") as f:
+        f.write(file_content)
+    return path, mime_type, f"chart.{extension}"
+
+def _stream_file(path: str, chunk_size: int = 64 * 1024):
+    """分块读取临时文件，读取完毕后删除"""
+    try:
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        os.remove(path)
+
+def _etag_candidates(if_none_match: Optional[str]) -> List[str]:
+    """解析If-None-Match请求头中的ETag列表（去掉弱校验前缀和引号）"""
+    if not if_none_match:
+        return []
+    return [value.strip().removeprefix("W/").strip('"') for value in if_none_match.split(",") if value.strip()]
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """判断If-None-Match请求头是否包含指定ETag"""
+    candidates = _etag_candidates(if_none_match)
+    return "*" in candidates or etag in candidates
+
+def _cache_stream(key: str, mime_type: str, chunks):
+    """透传内容片段，全部输出后写入导出缓存"""
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    artifact_cache.set(key, b''.join(parts), mime_type)
+
+@app.get("/embed/{embed_id}")
+async def get_embed_page(embed_id: str, raw_request: Request):
+    """托管的图表嵌入页面，页面加载后获取同ID的配置JSON"""
+    if embed_store.get_compressed(embed_id) is None:
+        raise HTTPException(status_code=404, detail="嵌入图表不存在")
+    
+    page = export_service.embed_page(f"/embed/{embed_id}/config.json")
+    return _immutable_response(
+        raw_request, f"{embed_id}-page", gzip.compress(page.encode('utf-8')), "text/html; charset=utf-8"
+    )
+
+@app.get("/embed/{embed_id}/config.json")
+async def get_embed_config(embed_id: str, raw_request: Request):
+    """托管嵌入图表的ECharts配置"""
+    compressed = embed_store.get_compressed(embed_id)
+    if compressed is None:
+        raise HTTPException(status_code=404, detail="嵌入图表不存在")
+    
+    return _immutable_response(raw_request, embed_id, compressed, "application/json")
+
+def _immutable_response(raw_request: Request, etag: str, compressed: bytes, media_type: str) -> Response:
+    """返回按ID不可变的嵌入内容（缓存时间见EMBED_CACHE_CONTROL），客户端支持gzip时直接输出压缩内容"""
+    headers = {
+        "ETag": f'"{etag}"',
+        "Cache-Control": EMBED_CACHE_CONTROL,
+        "Vary": "Accept-Encoding"
+    }
+    if _etag_matches(raw_request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    if _accepts_gzip(raw_request.headers.get("accept-encoding")):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=compressed, media_type=media_type, headers=headers)
+    return Response(content=gzip.decompress(compressed), media_type=media_type, headers=headers)
+
+def _accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """判断Accept-Encoding请求头是否接受gzip"""
+    for value in (accept_encoding or "").split(","):
+        coding, _, params = value.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "").lower() not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
 @app.post("/chart-config")
 async def get_chart_config(request: Dict[str, Any]):
     """获取图表配置"""
@@ -208,14 +734,310 @@ async def get_chart_config(request: Dict[str, Any]):
         chart_type = request.get("chartType")
         data = request.get("data", [])
         columns = request.get("columns", [])
+        options = request.get("options") or {}
+        
+        config = chart_generator.generate_config(chart_type, data, columns, options)
+        return FastJSONResponse(config)
+        
+    except ValueError as e:
+        # 不支持的聚合方式、分箱规则、降采样方式等选项
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"获取图表配置失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"获取图表配置失败: {str(e)}")
+
+@app.post("/recommendations/stream")
+async def stream_recommendations(request: Dict[str, Any]):
+    """
+    以Server-Sent Events流式返回AI图表推荐
+    
+    事件类型：
+    - recommendation: 单个已验证的图表推荐，模型输出一个即推送一个
+    - done: 全部推荐（按分数排序）
+    """
+    try:
+        data = request.get("data", [])
+        columns = request.get("columns", [])
+        df = pd.DataFrame(data)
+        
+    except Exception as e:
+        logger.error(f"解析推荐请求失败: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"解析推荐请求失败: {str(e)}")
+    
+    async def event_stream():
+        recommendations = []
+        async for rec in ai_analyzer.stream_recommendations(df, columns):
+            recommendations.append(rec)
+            yield _sse_event("recommendation", rec)
+        
+        recommendations.sort(key=lambda x: x["score"], reverse=True)
+        yield _sse_event("done", {"recommendations": recommendations})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _sse_event(event: str, data: Any) -> str:
+    """格式化一条Server-Sent Events消息"""
+    payload = dumps(data).decode('utf-8')
+    return f"event: {event}\ndata: {payload}\n\n"
+
+@app.post("/chart-config/patch")
+async def get_chart_config_patch(request: Dict[str, Any], if_none_match: Optional[str] = Header(None)):
+    """
+    获取图表配置相对于客户端已有版本的增量补丁（JSON Merge Patch）
+    
+    请求体与/chart-config相同（也可用dataset_id代替data/columns），客户端通过
+    If-None-Match请求头或base_etag字段提供已持有版本的ETag：
+    - 版本未变化：返回304
+    - 服务端仍保存该版本：返回application/merge-patch+json补丁
+    - 其他情况：返回完整配置
+    响应头ETag为新版本标识
+    """
+    try:
+        chart_type = request.get("chartType")
+        options = request.get("options") or {}
+        base_header = if_none_match or request.get("base_etag")
+        base_etags = _etag_candidates(base_header)
+        
+        dataset_id = request.get("dataset_id")
+        if dataset_id:
+            dataset = dataset_store.get(dataset_id)
+            if dataset is None:
+                raise HTTPException(status_code=404, detail="数据集不存在或已过期")
+            data = dataset["df"]
+            columns = dataset["columns"]
+        else:
+            data = request.get("data", [])
+            columns = request.get("columns", [])
+        
+        loop = asyncio.get_running_loop()
+        config, etag = await loop.run_in_executor(
+            None,
+            lambda: chart_generator.generate_versioned_config(chart_type, data, columns, options, dataset_key=dataset_id)
+        )
+        headers = {"ETag": f'"{etag}"'}
+        
+        if _etag_matches(base_header, etag):
+            return Response(status_code=304, headers=headers)
+        
+        if etag not in config_versions:
+            config_versions.set(etag, config)
+        
+        # 客户端可能提供多个ETag，使用第一个服务端仍保存的版本
+        base_etag = next((candidate for candidate in base_etags if candidate in config_versions), None)
+        base_config = config_versions.get(base_etag) if base_etag else None
+        if base_config is None:
+            return FastJSONResponse(content=config, headers=headers)
+        
+        patch = merge_patch_diff(base_config, config)
+        headers["X-Patch-Base"] = f'"{base_etag}"'
+        return FastJSONResponse(content=patch, headers=headers, media_type=MERGE_PATCH_MEDIA_TYPE)
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"获取图表配置补丁失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"获取图表配置补丁失败: {str(e)}")
+
+@app.post("/chart-config/batch")
+async def get_chart_configs_batch(request: Dict[str, Any]):
+    """
+    基于同一份数据批量获取多种图表配置
+    
+    请求体：
+    - dataset_id: 已上传数据集ID（与data/columns二选一）
+    - data/columns: 数据和列信息
+    - charts: [{"chartType": "柱状图", "options": {...}}, ...]
+    """
+    try:
+        chart_specs = request.get("charts", [])
+        if not chart_specs:
+            raise HTTPException(status_code=400, detail="charts不能为空")
+        
+        dataset_id = request.get("dataset_id")
+        if dataset_id:
+            dataset = dataset_store.get(dataset_id)
+            if dataset is None:
+                raise HTTPException(status_code=404, detail="数据集不存在或已过期")
+            data = dataset["df"]
+            columns = dataset["columns"]
+        else:
+            data = request.get("data", [])
+            columns = request.get("columns", [])
+        
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(
+            None,
+            lambda: chart_generator.generate_configs(chart_specs, data, columns, dataset_key=dataset_id)
+        )
+        return FastJSONResponse({"configs": results})
         
-        config = chart_generator.generate_config(chart_type, data, columns)
-        return config
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"批量获取图表配置失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"批量获取图表配置失败: {str(e)}")
+
+@app.get("/datasets/{dataset_id}/chart-config")
+async def get_dataset_chart_config(dataset_id: str, chart_type: str):
+    """获取已上传数据集的图表配置（按数据集缓存）"""
+    try:
+        return FastJSONResponse(await _get_dataset_chart_config(dataset_id, chart_type))
         
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"获取图表配置失败: {str(e)}")
         raise HTTPException(status_code=500, detail=f"获取图表配置失败: {str(e)}")
 
+@app.get("/datasets/{dataset_id}/thumbnail")
+async def get_dataset_thumbnail(dataset_id: str, chart_type: str, raw_request: Request, format: str = "svg"):
+    """
+    获取推荐图表的缩略图（SVG或PNG）
+    
+    上传后为每个推荐图表在后台生成，未生成的图表在首次请求时生成。
+    """
+    dataset = dataset_store.get(dataset_id)
+    if dataset is None:
+        raise HTTPException(status_code=404, detail="数据集不存在或已过期")
+    if format not in THUMBNAIL_FORMATS:
+        raise HTTPException(status_code=400, detail=f"不支持的缩略图格式: {format}，支持: {', '.join(THUMBNAIL_FORMATS)}")
+    if chart_type not in chart_generator.supported_charts:
+        raise HTTPException(status_code=400, detail=f"不支持的图表类型: {chart_type}")
+    if format == 'png' and not render_pool.available:
+        raise HTTPException(status_code=501, detail="PNG缩略图需要安装cairosvg")
+    
+    # 生成任务由多个请求共享，客户端断开时不取消
+    thumbnails = await asyncio.shield(thumbnail_service.schedule(dataset, chart_type))
+    if thumbnails is None:
+        raise HTTPException(status_code=500, detail=f"{chart_type}缩略图生成失败")
+    
+    content = thumbnails[format]
+    etag = hashlib.sha1(content).hexdigest()
+    headers = {"ETag": f'"{etag}"', "Cache-Control": "private, max-age=3600"}
+    if _etag_matches(raw_request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type=THUMBNAIL_FORMATS[format], headers=headers)
+
+@app.get("/datasets/{dataset_id}/export")
+async def export_dataset(dataset_id: str, format: str = "csv"):
+    """
+    导出清洗后的数据集
+    
+    支持的格式：
+    - csv: 分块流式生成（UTF-8带BOM）
+    - parquet: Parquet文件（需要pyarrow）
+    - arrow: Arrow IPC文件（需要pyarrow）
+    
+    各列按推断的类型输出，Parquet/Arrow的schema元数据中附带列信息。
+    """
+    dataset = dataset_store.get(dataset_id)
+    if dataset is None:
+        raise HTTPException(status_code=404, detail="数据集不存在或已过期")
+    if format not in DATASET_EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"不支持的数据集导出格式: {format}，支持: {', '.join(DATASET_EXPORT_FORMATS)}"
+        )
+    
+    filename = f"{os.path.splitext(dataset['metadata'].get('original_filename') or 'dataset')[0]}.{format}"
+    headers = {"Content-Disposition": _content_disposition(filename)}
+    media_type = DATASET_EXPORT_FORMATS[format]
+    
+    if format == 'csv':
+        return StreamingResponse(
+            dataset_exporter.iter_csv(dataset["df"], dataset["columns"]),
+            media_type=media_type,
+            headers=headers
+        )
+    
+    if not dataset_exporter.columnar_available:
+        raise HTTPException(status_code=501, detail="Parquet/Arrow导出需要安装pyarrow")
+    
+    try:
+        loop = asyncio.get_running_loop()
+        path = await loop.run_in_executor(
+            None,
+            lambda: dataset_exporter.write_columnar(dataset["df"], dataset["columns"], format)
+        )
+    except Exception as e:
+        logger.error(f"数据集导出失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"数据集导出失败: {str(e)}")
+    
+    headers["Content-Length"] = str(os.path.getsize(path))
+    return StreamingResponse(_stream_file(path), media_type=media_type, headers=headers)
+
+def _content_disposition(filename: str) -> str:
+    """附件下载响应头，非ASCII文件名按RFC 5987编码"""
+    fallback = filename if filename.isascii() else f"download{os.path.splitext(filename)[1]}"
+    fallback = fallback.replace('"', '_')
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename)}"
+
+@app.post("/datasets/{dataset_id}/resample")
+async def resample_dataset(dataset_id: str, request: Dict[str, Any]):
+    """
+    按日期列对已上传数据集进行时间序列重采样
+    
+    请求体：
+    - freq: 重采样频率（day/week/month/quarter/year）
+    - date_column: 日期列名（可选，默认第一个日期列）
+    - aggregations: 聚合方式，字符串或{列名: 聚合方式}（可选，默认求和）
+    - chartType/options: 可选，直接返回基于重采样数据的图表配置
+    """
+    dataset = dataset_store.get(dataset_id)
+    if dataset is None:
+        raise HTTPException(status_code=404, detail="数据集不存在或已过期")
+    
+    try:
+        loop = asyncio.get_running_loop()
+        resampled_df, resampled_columns = await loop.run_in_executor(
+            None,
+            lambda: data_processor.resample_time_series(
+                dataset["df"],
+                dataset["columns"],
+                request.get("freq", "day"),
+                request.get("date_column"),
+                request.get("aggregations")
+            )
+        )
+        result = {
+            "data": resampled_df.to_dict('records'),
+            "columns": resampled_columns,
+            "metadata": {
+                "freq": request.get("freq", "day"),
+                "rows_count": len(resampled_df),
+                "source_rows_count": len(dataset["df"])
+            }
+        }
+        
+        chart_type = request.get("chartType")
+        if chart_type:
+            result["config"] = await loop.run_in_executor(
+                None,
+                chart_generator.generate_config,
+                chart_type,
+                resampled_df,
+                resampled_columns,
+                request.get("options") or {}
+            )
+        
+        return FastJSONResponse(result)
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"时间序列重采样失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"时间序列重采样失败: {str(e)}")
+
 @app.get("/charts/types")
 async def get_supported_chart_types():
     """获取支持的图表类型列表"""
@@ -47,6 +47,11 @@ class ExportFormat(str, Enum):
     IFRAME = "iframe"
     PPTX = "pptx"
 
+class EmbedMode(str, Enum):
+    """iframe嵌入方式枚举"""
+    HOSTED = "hosted"
+    INLINE = "inline"
+
 class ExportOptions(BaseModel):
     """导出选项"""
     format: ExportFormat = Field(..., description="导出格式")
@@ -54,6 +59,7 @@ class ExportOptions(BaseModel):
     width: Optional[int] = Field(800, description="图片宽度")
     height: Optional[int] = Field(600, description="图片高度")
     title: Optional[str] = Field(None, description="图表标题")
+    embed_mode: EmbedMode = Field(EmbedMode.HOSTED, description="iframe嵌入方式：hosted引用托管页面，inline将配置内联到data URI")
 
 class ExportRequest(BaseModel):
     """导出请求"""
@@ -61,6 +67,59 @@ class ExportRequest(BaseModel):
     format: ExportFormat = Field(..., description="导出格式") 
     options: ExportOptions = Field(..., description="导出选项")
 
+class ExportChartMeta(BaseModel):
+    """导出请求中的图表信息（不含数据行）"""
+    recommendations: List[ChartRecommendation] = Field(default_factory=list, description="图表推荐列表")
+    columns: List[ColumnInfo] = Field(default_factory=list, description="列信息")
+    metadata: Optional[Dict[str, Any]] = Field(None, description="元数据信息")
+
+class LightExportRequest(BaseModel):
+    """
+    轻量导出请求：只校验格式、选项和列信息等小字段
+    
+    数据行不经过pydantic逐行校验和复制，由from_payload原样取出
+    """
+    chart_data: Optional[ExportChartMeta] = Field(None, description="图表信息")
+    dataset_id: Optional[str] = Field(None, description="已上传数据集ID（代替chart_data中的数据）")
+    chart_type: Optional[str] = Field(None, description="图表类型，默认使用第一个推荐")
+    format: ExportFormat = Field(..., description="导出格式")
+    options: ExportOptions = Field(..., description="导出选项")
+    
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]):
+        """
+        从已解析的请求体构造请求对象
+        
+        Returns:
+            (请求对象, 数据行列表或{列名: 数组}的列式数据)
+        """
+        if not isinstance(payload, dict):
+            raise ValueError("请求体必须是JSON对象")
+        
+        payload = dict(payload)
+        data = []
+        chart_data = payload.get("chart_data")
+        if isinstance(chart_data, dict):
+            chart_data = dict(chart_data)
+            data = chart_data.pop("data", None) or []
+            payload["chart_data"] = chart_data
+        if not isinstance(data, (list, dict)):
+            raise ValueError("chart_data.data必须是行列表或列式对象")
+        
+        request = cls.model_validate(payload)
+        if request.chart_data is None and not request.dataset_id:
+            raise ValueError("chart_data和dataset_id不能同时为空")
+        return request, data
+    
+    @property
+    def chart(self) -> Optional[str]:
+        """要导出的图表类型"""
+        if self.chart_type:
+            return self.chart_type
+        if self.chart_data and self.chart_data.recommendations:
+            return self.chart_data.recommendations[0].chart
+        return None
+
 class APIResponse(BaseModel):
     """API响应基类"""
     success: bool = Field(..., description="请求是否成功")
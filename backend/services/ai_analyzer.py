@@ -2,9 +2,10 @@ import openai
 import pandas as pd
 import json
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Optional
 import asyncio
 import os
+from contextlib import aclosing
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -69,7 +70,7 @@ class AIAnalyzer:
             recommendations = await self._call_deepseek_api(prompt)
             
             # 验证和标准化推荐结果
-            validated_recommendations = self._validate_recommendations(recommendations)
+            validated_recommendations = self._validate_recommendations(recommendations, columns_info)
             
             logger.info(f"AI推荐完成，返回{len(validated_recommendations)}个图表类型")
             return validated_recommendations
@@ -79,6 +80,45 @@ class AIAnalyzer:
             # 返回默认推荐
             return self._get_default_recommendations(columns_info)
     
+    async def stream_recommendations(self, df: pd.DataFrame, columns_info: List[Dict]) -> AsyncIterator[Dict]:
+        """
+        流式推荐图表类型，每解析出一个完整且有效的推荐即返回
+        
+        与recommend_charts的选取规则相同：模型按推荐度输出，取前3个有效且不重复的推荐，
+        不足时用默认推荐补齐；最终按分数排序由调用方完成（RecommendationJob.complete）。
+        
+        Args:
+            df: 清洗后的数据
+            columns_info: 列信息
+            
+        Yields:
+            单个图表推荐
+        """
+        emitted = []
+        try:
+            data_summary = self._prepare_data_summary(df, columns_info)
+            prompt = self._build_chart_recommendation_prompt(data_summary)
+            
+            # 提前结束或被取消时关闭API流，释放连接
+            async with aclosing(self._stream_deepseek_api(prompt)) as stream:
+                async for rec in stream:
+                    validated = self._accept_recommendation(rec, emitted)
+                    if validated is None:
+                        continue
+                    emitted.append(validated)
+                    yield validated
+                    if len(emitted) >= 3:
+                        break
+                    
+        except Exception as e:
+            logger.error(f"AI流式图表推荐失败: {str(e)}")
+        
+        for default in self._padding_recommendations(emitted, columns_info):
+            emitted.append(default)
+            yield default
+        
+        logger.info(f"AI流式推荐完成，返回{len(emitted)}个图表类型")
+    
     def _prepare_data_summary(self, df: pd.DataFrame, columns_info: List[Dict]) -> Dict:
         """准备数据摘要"""
         return {
@@ -117,7 +157,7 @@ class AIAnalyzer:
 {json.dumps(data_summary['columns'], ensure_ascii=False, indent=2)}
 
 数据样本 (前5行):
-{json.dumps(data_summary['data_sample'], ensure_ascii=False, indent=2)}
+{json.dumps(data_summary['data_sample'], ensure_ascii=False, indent=2, default=str)}
 
 可选图表类型:
 {chart_types_text}
@@ -185,49 +225,112 @@ class AIAnalyzer:
             logger.error(f"调用DeepSeek API失败: {str(e)}")
             raise
     
-    def _validate_recommendations(self, recommendations: List[Dict]) -> List[Dict]:
-        """验证和标准化推荐结果"""
-        validated = []
+    async def _stream_deepseek_api(self, prompt: str) -> AsyncIterator[Dict]:
+        """以流式方式调用DeepSeek API，逐个返回解析出的推荐对象"""
+        try:
+            stream = await self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {
+                        "role": "system", 
+                        "content": "你是一名专业的数据可视化专家，具有丰富的图表设计经验。请根据用户提供的数据特征，推荐最合适的图表类型。"
+                    },
+                    {
+                        "role": "user", 
+                        "content": prompt
+                    }
+                ],
+                temperature=0.1,
+                max_tokens=1500,
+                top_p=0.9,
+                stream=True
+            )
+            
+            parser = _JSONArrayStreamParser()
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                for rec in parser.feed(delta):
+                    yield rec
+                if parser.finished:
+                    break
+                    
+        except Exception as e:
+            logger.error(f"流式调用DeepSeek API失败: {str(e)}")
+            raise
+    
+    def _validate_recommendation(self, rec: Any) -> Optional[Dict]:
+        """验证和标准化单个推荐结果，无效时返回None"""
+        # 检查必需字段
+        if not isinstance(rec, dict) or not all(key in rec for key in ["chart", "reason", "score"]):
+            return None
         
         valid_chart_names = {chart["name"] for chart in self.chart_types}
         
-        for rec in recommendations:
-            # 检查必需字段
-            if not all(key in rec for key in ["chart", "reason", "score"]):
-                continue
-                
-            # 验证图表名称
-            if rec["chart"] not in valid_chart_names:
-                # 尝试模糊匹配
-                matched_chart = self._fuzzy_match_chart(rec["chart"])
-                if matched_chart:
-                    rec["chart"] = matched_chart
-                else:
-                    continue
-            
-            # 验证分数范围
+        # 验证图表名称
+        if rec["chart"] not in valid_chart_names:
+            # 尝试模糊匹配
+            matched_chart = self._fuzzy_match_chart(str(rec["chart"]))
+            if not matched_chart:
+                return None
+            rec["chart"] = matched_chart
+        
+        # 验证分数范围
+        try:
             score = float(rec["score"])
-            if not (0 <= score <= 1):
-                score = max(0, min(1, score))  # 限制在0-1范围内
-                rec["score"] = score
-            
-            validated.append(rec)
+        except (TypeError, ValueError):
+            return None
+        rec["score"] = max(0, min(1, score))  # 限制在0-1范围内
+        
+        return rec
+    
+    def _validate_recommendations(self, recommendations: List[Dict], columns_info: List[Dict] = None) -> List[Dict]:
+        """验证和标准化推荐结果，选取规则与stream_recommendations一致"""
+        validated = []
+        
+        # 模型按推荐度输出，取前3个有效且不重复的推荐
+        for rec in recommendations:
+            rec = self._accept_recommendation(rec, validated)
+            if rec is not None:
+                validated.append(rec)
+            if len(validated) >= 3:
+                break
         
         # 确保至少有3个推荐
-        while len(validated) < 3:
-            default_charts = ["柱状图", "折线图", "饼图"]
-            for chart in default_charts:
-                if chart not in [r["chart"] for r in validated]:
-                    validated.append({
-                        "chart": chart,
-                        "reason": "默认推荐",
-                        "score": 0.6
-                    })
-                    break
+        validated.extend(self._padding_recommendations(validated, columns_info or []))
         
-        # 按分数排序并取前3个
+        # 按分数排序
         validated.sort(key=lambda x: x["score"], reverse=True)
-        return validated[:3]
+        return validated
+    
+    def _accept_recommendation(self, rec: Any, selected: List[Dict]) -> Optional[Dict]:
+        """验证单个推荐，无效或与已选图表重复时返回None"""
+        validated = self._validate_recommendation(rec)
+        if validated is None or validated["chart"] in [r["chart"] for r in selected]:
+            return None
+        return validated
+    
+    def _padding_recommendations(self, selected: List[Dict], columns_info: List[Dict]) -> List[Dict]:
+        """推荐不足3个时用于补齐的默认推荐（优先按数据类型规则推荐）"""
+        padding = []
+        charts = [r["chart"] for r in selected]
+        for default in self._get_default_recommendations(columns_info) + self._get_fallback_recommendations():
+            if len(selected) + len(padding) >= 3:
+                break
+            if default["chart"] not in charts:
+                charts.append(default["chart"])
+                padding.append(default)
+        return padding
+    
+    def _get_fallback_recommendations(self) -> List[Dict]:
+        """推荐数量不足时用于补齐的默认图表"""
+        return [
+            {"chart": chart, "reason": "默认推荐", "score": 0.6}
+            for chart in ["柱状图", "折线图", "饼图"]
+        ]
     
     def _fuzzy_match_chart(self, chart_name: str) -> str:
         """模糊匹配图表名称"""
@@ -283,4 +386,65 @@ class AIAnalyzer:
             if default["chart"] not in [r["chart"] for r in recommendations]:
                 recommendations.append(default)
         
-        return recommendations[:3]
\ No newline at end of file
+        return recommendations[:3]
+
+
+class _JSONArrayStreamParser:
+    """增量解析模型输出中的JSON数组，每当一个顶层对象闭合时即返回该对象"""
+    
+    def __init__(self):
+        self.buffer = ""
+        self.position = 0
+        self.array_started = False
+        self.finished = False
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.object_start = None
+    
+    def feed(self, text: str) -> List[Dict]:
+        """追加一段文本，返回本次新解析出的完整对象"""
+        self.buffer += text
+        objects = []
+        
+        while self.position < len(self.buffer) and not self.finished:
+            char = self.buffer[self.position]
+            
+            if not self.array_started:
+                if char == '[':
+                    self.array_started = True
+            elif self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char == '{':
+                if self.depth == 0:
+                    self.object_start = self.position
+                self.depth += 1
+            elif char == '}' and self.depth > 0:
+                self.depth -= 1
+                if self.depth == 0:
+                    obj_str = self.buffer[self.object_start:self.position + 1]
+                    try:
+                        objects.append(json.loads(obj_str))
+                    except json.JSONDecodeError as e:
+                        logger.warning(f"跳过无法解析的推荐对象: {str(e)}")
+                    self.object_start = None
+            elif char == ']' and self.depth == 0:
+                self.finished = True
+            
+            self.position += 1
+        
+        # 丢弃已处理完的文本，避免缓冲区无限增长
+        keep_from = self.object_start if self.object_start is not None else self.position
+        self.buffer = self.buffer[keep_from:]
+        self.position -= keep_from
+        if self.object_start is not None:
+            self.object_start = 0
+        
+        return objects
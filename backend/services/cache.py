@@ -0,0 +1,213 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import pandas as pd
+
+from .serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """按条目数和字节数双重限制的LRU缓存（线程安全）"""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024,
+                 sizeof: Callable[[Any], int] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or _json_size
+        self._items: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """获取缓存值，未命中时返回None"""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key: Hashable, value: Any):
+        """写入缓存，超出限制时淘汰最久未使用的条目"""
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            logger.info(f"缓存条目过大({size} bytes)，跳过缓存")
+            return
+
+        with self._lock:
+            if key in self._items:
+                self.current_bytes -= self._items.pop(key)[1]
+            self._items[key] = (value, size)
+            self.current_bytes += size
+
+            while len(self._items) > self.max_entries or self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._items.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> Dict:
+        """缓存统计信息"""
+        return {
+            "entries": len(self._items),
+            "bytes": self.current_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+
+class ChartConfigCache:
+    """图表配置缓存，键为(数据集指纹, 图表类型, 列信息, 规范化的数据相关选项)"""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        self._cache = LRUCache(max_entries=max_entries, max_bytes=max_bytes)
+
+    def make_key(self, dataset_key: str, chart_type: str, columns: List[Dict], data_options: Dict) -> tuple:
+        """构造缓存键"""
+        columns_key = tuple((col.get('name'), col.get('type')) for col in columns)
+        options_key = json.dumps(data_options, sort_keys=True, ensure_ascii=False, default=str)
+        return dataset_key, chart_type, columns_key, options_key
+
+    def get(self, key: tuple) -> Optional[Dict]:
+        return self._cache.get(key)
+
+    def set(self, key: tuple, config: Dict):
+        self._cache.set(key, config)
+
+    def stats(self) -> Dict:
+        return self._cache.stats()
+
+
+class ArtifactCache:
+    """
+    导出文件缓存，键为(规范化的图表配置, 导出格式, 导出选项)的内容哈希
+    
+    内存层为按字节数限制的LRU；指定disk_dir时同时写入磁盘层，内存未命中时从磁盘读取并回填。
+    max_disk_bytes为None时磁盘层不淘汰
+    """
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 256 * 1024 * 1024,
+                 disk_dir: str = None, max_disk_bytes: Optional[int] = 1024 * 1024 * 1024):
+        self._memory = LRUCache(max_entries=max_entries, max_bytes=max_bytes, sizeof=lambda item: len(item[0]))
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_hits = 0
+        self._disk_lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def make_key(self, config: Dict, format_type: str, options: Dict) -> str:
+        """计算内容哈希（键顺序无关）"""
+        payload = {'config': config, 'format': format_type, 'options': options}
+        return hashlib.sha256(dumps(payload, sort_keys=True)).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        """获取(文件内容, MIME类型)，未命中时返回None"""
+        item = self._memory.get(key)
+        if item is not None or not self.disk_dir:
+            return item
+
+        item = self._read_disk(key)
+        if item is not None:
+            self.disk_hits += 1
+            self._memory.set(key, item)
+        return item
+
+    def set(self, key: str, content: bytes, mime_type: str):
+        """写入缓存"""
+        item = (content, mime_type)
+        self._memory.set(key, item)
+        if self.disk_dir:
+            self._write_disk(key, item)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key)
+
+    def _read_disk(self, key: str) -> Optional[Tuple[bytes, str]]:
+        try:
+            with open(self._disk_path(key), 'rb') as f:
+                mime_type = f.readline().decode('utf-8').strip()
+                return f.read(), mime_type
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, item: Tuple[bytes, str]):
+        content, mime_type = item
+        path = self._disk_path(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(mime_type.encode('utf-8') + b'\n')
+                f.write(content)
+            os.replace(temp_path, path)
+            if self.max_disk_bytes is not None:
+                self._trim_disk()
+        except OSError as e:
+            logger.warning(f"写入导出缓存文件失败: {str(e)}")
+
+    def _trim_disk(self):
+        """磁盘层超出容量时按最近访问时间淘汰"""
+        with self._disk_lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.disk_dir):
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    stat = entry.stat()
+                    entries.append((stat.st_atime, stat.st_size, entry.path))
+                    total += stat.st_size
+            if total <= self.max_disk_bytes:
+                return
+            for _, size, path in sorted(entries):
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                if total <= self.max_disk_bytes:
+                    break
+
+    def stats(self) -> Dict:
+        """缓存统计信息"""
+        return {**self._memory.stats(), "disk_dir": self.disk_dir, "disk_hits": self.disk_hits}
+
+
+def dataset_fingerprint(df: pd.DataFrame) -> str:
+    """计算DataFrame内容指纹（列名、类型和逐行哈希）"""
+    digest = hashlib.sha1()
+    digest.update(json.dumps([str(name) for name in df.columns], ensure_ascii=False).encode('utf-8'))
+    digest.update(json.dumps([str(dtype) for dtype in df.dtypes]).encode('utf-8'))
+    if len(df.columns):
+        try:
+            digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        except TypeError:
+            # 含有不可哈希的单元格（如列表）时退化为序列化内容
+            digest.update(df.to_json(orient='split', date_format='iso', default_handler=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _json_size(value: Any) -> int:
+    """按JSON序列化后的字节数估算对象大小"""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    return len(dumps(value))
@@ -1,13 +1,27 @@
+import hashlib
 import logging
-from typing import Dict, List, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Any, Union
 import json
+import numpy as np
+import pandas as pd
+
+from .downsampling import DOWNSAMPLE_METHODS, lttb_indices, minmax_indices, grid_thin_indices
+from .statistics import box_plot_stats, histogram
+from .cache import ChartConfigCache, dataset_fingerprint
 
 logger = logging.getLogger(__name__)
 
+# 图表数据输入：DataFrame、{列名: 数组}或行字典列表
+ChartInput = Union[pd.DataFrame, Dict[str, Any], List[Dict]]
+
 class ChartGenerator:
     """图表配置生成器"""
     
-    def __init__(self):
+    def __init__(self, config_cache: ChartConfigCache = None):
+        # 图表配置缓存（只缓存与展示选项无关的数据层）
+        self.config_cache = config_cache or ChartConfigCache()
+        
         # 颜色主题
         self.color_themes = [
             ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf'],
@@ -24,84 +38,31 @@ class ChartGenerator:
             "直方图", "热力图", "瀑布图", "漏斗图", "树形图", "泡泡图", "桑基图", 
             "玫瑰图", "堆积条形图", "堆积面积图", "双轴图"
         ]
+        
+        # 支持的聚合方式
+        self.supported_aggregations = ['sum', 'mean', 'count', 'max', 'min']
+        
+        # 与数据无关的展示选项，修改它们不需要重新生成数据
+        self.presentation_options = ['title', 'colorTheme', 'legendPosition', 'showGrid']
     
-    def generate_config(self, chart_type: str, data: List[Dict], columns: List[Dict], custom_config: Dict = None) -> Dict:
+    def generate_config(self, chart_type: str, data: ChartInput, columns: List[Dict], custom_config: Dict = None,
+                        dataset_key: str = None) -> Dict:
         """
         生成ECharts图表配置
         
         Args:
             chart_type: 图表类型
-            data: 数据
+            data: 数据，支持DataFrame、{列名: 数组}或行字典列表
             columns: 列信息
             custom_config: 自定义配置
+            dataset_key: 数据集标识，用作缓存键，默认按数据内容计算指纹
             
         Returns:
             ECharts配置对象
         """
         try:
-            if custom_config is None:
-                custom_config = {}
-                
-            # 获取颜色主题
-            colors = self.color_themes[custom_config.get('colorTheme', 0)]
-            
-            # 基础配置
-            base_config = {
-                'backgroundColor': 'transparent',
-                'color': colors,
-                'title': {
-                    'text': custom_config.get('title', ''),
-                    'left': 'center',
-                    'textStyle': {
-                        'fontSize': 16,
-                        'fontWeight': 'bold'
-                    }
-                },
-                'tooltip': {
-                    'trigger': 'axis',
-                    'axisPointer': {
-                        'type': 'shadow'
-                    }
-                },
-                'legend': {
-                    'show': custom_config.get('legendPosition', 'top') != 'none',
-                    'orient': 'vertical' if custom_config.get('legendPosition') in ['left', 'right'] else 'horizontal',
-                    'left': self._get_legend_position(custom_config.get('legendPosition', 'top'), 'left'),
-                    'top': self._get_legend_position(custom_config.get('legendPosition', 'top'), 'top')
-                },
-                'grid': {
-                    'show': custom_config.get('showGrid', True),
-                    'left': '3%',
-                    'right': '4%', 
-                    'bottom': '3%',
-                    'containLabel': True
-                }
-            }
-            
-            # 根据图表类型生成具体配置
-            if chart_type in ['条形图', '柱状图']:
-                config = self._generate_bar_chart(data, columns, base_config, chart_type == '条形图')
-            elif chart_type == '折线图':
-                config = self._generate_line_chart(data, columns, base_config)
-            elif chart_type == '饼图':
-                config = self._generate_pie_chart(data, columns, base_config)
-            elif chart_type == '散点图':
-                config = self._generate_scatter_chart(data, columns, base_config)
-            elif chart_type == '面积图':
-                config = self._generate_area_chart(data, columns, base_config)
-            elif chart_type == '雷达图':
-                config = self._generate_radar_chart(data, columns, base_config)
-            elif chart_type == '热力图':
-                config = self._generate_heatmap_chart(data, columns, base_config)
-            elif chart_type == '漏斗图':
-                config = self._generate_funnel_chart(data, columns, base_config)
-            elif chart_type == '堆积条形图':
-                config = self._generate_stacked_bar_chart(data, columns, base_config)
-            elif chart_type == '堆积面积图':
-                config = self._generate_stacked_area_chart(data, columns, base_config)
-            else:
-                # 默认生成柱状图
-                config = self._generate_bar_chart(data, columns, base_config, False)
+            df = self._to_frame(data)
+            config = self._build_config(chart_type, df, columns, custom_config or {}, dataset_key or dataset_fingerprint(df))
             
             logger.info(f"生成{chart_type}配置成功")
             return config
@@ -110,6 +71,247 @@ class ChartGenerator:
             logger.error(f"生成图表配置失败: {str(e)}")
             raise
     
+    def generate_versioned_config(self, chart_type: str, data: ChartInput, columns: List[Dict], custom_config: Dict = None,
+                                  dataset_key: str = None):
+        """
+        生成图表配置及其版本标识（ETag）
+        
+        ETag由数据集标识、图表类型、列信息和全部选项决定，无需序列化配置即可计算
+        
+        Returns:
+            (ECharts配置对象, ETag)
+        """
+        custom_config = custom_config or {}
+        df = self._to_frame(data)
+        dataset_key = dataset_key or dataset_fingerprint(df)
+        
+        config = self.generate_config(chart_type, df, columns, custom_config, dataset_key)
+        
+        data_options, presentation_options = self._split_options(custom_config)
+        version = json.dumps(
+            [self.config_cache.make_key(dataset_key, chart_type, columns, data_options), presentation_options],
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return config, hashlib.sha1(version.encode('utf-8')).hexdigest()
+    
+    def generate_configs(self, chart_specs: List[Dict], data: ChartInput, columns: List[Dict], max_workers: int = 4,
+                         dataset_key: str = None) -> List[Dict]:
+        """
+        基于同一份数据批量生成多种图表配置
+        
+        Args:
+            chart_specs: 图表规格列表，每项包含chartType和可选的options
+            data: 数据，支持DataFrame、{列名: 数组}或行字典列表
+            columns: 列信息
+            max_workers: 并行生成的线程数
+            dataset_key: 数据集标识，用作缓存键，默认按数据内容计算指纹
+            
+        Returns:
+            与chart_specs顺序一致的结果列表，每项包含chartType以及config或error
+        """
+        # 数据只转换一次，所有图表共享同一份列式数据和指纹
+        df = self._to_frame(data)
+        dataset_key = dataset_key or dataset_fingerprint(df)
+        
+        def generate(spec: Dict) -> Dict:
+            chart_type = spec.get('chartType')
+            try:
+                config = self._build_config(chart_type, df, columns, spec.get('options') or {}, dataset_key)
+                return {'chartType': chart_type, 'config': config}
+            except Exception as e:
+                logger.error(f"批量生成{chart_type}配置失败: {str(e)}")
+                return {'chartType': chart_type, 'error': str(e)}
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chart_specs)))) as executor:
+            results = list(executor.map(generate, chart_specs))
+        
+        logger.info(f"批量生成{len(results)}个图表配置完成")
+        return results
+    
+    def _build_config(self, chart_type: str, df: pd.DataFrame, columns: List[Dict], custom_config: Dict, dataset_key: str) -> Dict:
+        """生成单个图表的完整配置：数据层按缓存键复用，展示选项每次叠加"""
+        data_options, _ = self._split_options(custom_config)
+        cache_key = self.config_cache.make_key(dataset_key, chart_type, columns, data_options)
+        
+        data_layer = self.config_cache.get(cache_key)
+        if data_layer is None:
+            base_config = self._build_base_config({})
+            data_layer = self._generate_chart(chart_type, df, columns, base_config, data_options)
+            
+            if data_options.get('useDataset'):
+                data_layer = self._to_dataset_mode(data_layer)
+            
+            self.config_cache.set(cache_key, data_layer)
+        
+        return self.apply_presentation(data_layer, custom_config)
+    
+    def _split_options(self, custom_config: Dict):
+        """将自定义配置拆分为(数据相关选项, 展示选项)"""
+        data_options = {}
+        presentation_options = {}
+        for key, value in (custom_config or {}).items():
+            if key in self.presentation_options:
+                presentation_options[key] = value
+            else:
+                data_options[key] = value
+        return data_options, presentation_options
+    
+    def apply_presentation(self, config: Dict, custom_config: Dict) -> Dict:
+        """
+        在数据层配置上叠加展示选项（标题、颜色主题、图例位置、网格）
+        
+        返回新的配置对象，不修改传入的配置（它可能来自缓存）
+        """
+        presentation = self._build_base_config(custom_config or {})
+        
+        config = config.copy()
+        config['color'] = presentation['color']
+        config['title'] = presentation['title']
+        if 'legend' in config:
+            config['legend'] = {**config['legend'], **presentation['legend']}
+        if 'grid' in config:
+            config['grid'] = {**config['grid'], 'show': presentation['grid']['show']}
+        
+        return config
+    
+    def _to_dataset_mode(self, config: Dict) -> Dict:
+        """
+        将类目轴图表转换为ECharts dataset/encode形式
+        
+        类目和各系列数值只在dataset.source中存储一次，系列通过encode引用对应维度。
+        不满足条件的图表（无类目轴、系列数据不是与类目对齐的标量列表等）原样返回。
+        """
+        series = config.get('series')
+        if not isinstance(series, list) or not series:
+            return config
+        
+        # 确定类目轴（横向条形图的类目在y轴）
+        x_axis = config.get('xAxis')
+        y_axis = config.get('yAxis')
+        if isinstance(x_axis, dict) and x_axis.get('type') == 'category' and x_axis.get('data') is not None:
+            category_axis, category_key, value_key = x_axis, 'x', 'y'
+        elif isinstance(y_axis, dict) and y_axis.get('type') == 'category' and y_axis.get('data') is not None:
+            category_axis, category_key, value_key = y_axis, 'y', 'x'
+        else:
+            return config
+        
+        categories = category_axis['data']
+        for item in series:
+            data = item.get('data')
+            if not isinstance(data, list) or len(data) != len(categories):
+                return config
+            if any(isinstance(value, (list, dict)) for value in data):
+                return config
+        
+        # 维度名需唯一
+        dimensions = [category_axis.get('name') or 'category']
+        for item in series:
+            name = str(item.get('name', f'series{len(dimensions)}'))
+            while name in dimensions:
+                name = f"{name}_{len(dimensions)}"
+            dimensions.append(name)
+        
+        columns_data = [categories] + [item['data'] for item in series]
+        
+        # 按列存储的source（{维度名: 数组}），每个值只出现一次
+        config = config.copy()
+        config['dataset'] = {
+            'dimensions': dimensions,
+            'source': dict(zip(dimensions, columns_data))
+        }
+        config['series'] = [
+            {
+                **{key: value for key, value in item.items() if key != 'data'},
+                'encode': {category_key: dimensions[0], value_key: dimension}
+            }
+            for item, dimension in zip(series, dimensions[1:])
+        ]
+        axis_key = 'xAxis' if category_key == 'x' else 'yAxis'
+        config[axis_key] = {key: value for key, value in category_axis.items() if key != 'data'}
+        
+        return config
+    
+    def _build_base_config(self, custom_config: Dict) -> Dict:
+        """根据自定义配置生成与图表类型无关的基础配置"""
+        # 获取颜色主题
+        colors = self.color_themes[custom_config.get('colorTheme', 0)]
+        
+        return {
+            'backgroundColor': 'transparent',
+            'color': colors,
+            'title': {
+                'text': custom_config.get('title', ''),
+                'left': 'center',
+                'textStyle': {
+                    'fontSize': 16,
+                    'fontWeight': 'bold'
+                }
+            },
+            'tooltip': {
+                'trigger': 'axis',
+                'axisPointer': {
+                    'type': 'shadow'
+                }
+            },
+            'legend': {
+                'show': custom_config.get('legendPosition', 'top') != 'none',
+                'orient': 'vertical' if custom_config.get('legendPosition') in ['left', 'right'] else 'horizontal',
+                'left': self._get_legend_position(custom_config.get('legendPosition', 'top'), 'left'),
+                'top': self._get_legend_position(custom_config.get('legendPosition', 'top'), 'top')
+            },
+            'grid': {
+                'show': custom_config.get('showGrid', True),
+                'left': '3%',
+                'right': '4%', 
+                'bottom': '3%',
+                'containLabel': True
+            }
+        }
+    
+    def _generate_chart(self, chart_type: str, df: pd.DataFrame, columns: List[Dict], base_config: Dict, custom_config: Dict = None) -> Dict:
+        """根据图表类型分发到具体的生成方法"""
+        custom_config = custom_config or {}
+        
+        if chart_type in ['条形图', '柱状图']:
+            return self._generate_bar_chart(df, columns, base_config, chart_type == '条形图', custom_config)
+        elif chart_type == '折线图':
+            return self._generate_line_chart(df, columns, base_config, custom_config)
+        elif chart_type == '饼图':
+            return self._generate_pie_chart(df, columns, base_config, custom_config)
+        elif chart_type == '散点图':
+            return self._generate_scatter_chart(df, columns, base_config, custom_config)
+        elif chart_type == '面积图':
+            return self._generate_area_chart(df, columns, base_config, custom_config)
+        elif chart_type == '雷达图':
+            return self._generate_radar_chart(df, columns, base_config)
+        elif chart_type == '热力图':
+            return self._generate_heatmap_chart(df, columns, base_config, custom_config)
+        elif chart_type == '漏斗图':
+            return self._generate_funnel_chart(df, columns, base_config, custom_config)
+        elif chart_type == '箱线图':
+            return self._generate_boxplot_chart(df, columns, base_config, custom_config)
+        elif chart_type == '直方图':
+            return self._generate_histogram_chart(df, columns, base_config, custom_config)
+        elif chart_type == '瀑布图':
+            return self._generate_waterfall_chart(df, columns, base_config, custom_config)
+        elif chart_type == '树形图':
+            return self._generate_treemap_chart(df, columns, base_config, custom_config)
+        elif chart_type == '泡泡图':
+            return self._generate_bubble_chart(df, columns, base_config, custom_config)
+        elif chart_type == '桑基图':
+            return self._generate_sankey_chart(df, columns, base_config, custom_config)
+        elif chart_type == '玫瑰图':
+            return self._generate_rose_chart(df, columns, base_config, custom_config)
+        elif chart_type == '双轴图':
+            return self._generate_dual_axis_chart(df, columns, base_config, custom_config)
+        elif chart_type == '堆积条形图':
+            return self._generate_stacked_bar_chart(df, columns, base_config, custom_config)
+        elif chart_type == '堆积面积图':
+            return self._generate_stacked_area_chart(df, columns, base_config, custom_config)
+        else:
+            # 默认生成柱状图
+            return self._generate_bar_chart(df, columns, base_config, False, custom_config)
+    
     def _get_legend_position(self, position: str, axis: str) -> str:
         """获取图例位置"""
         position_map = {
@@ -120,6 +322,183 @@ class ChartGenerator:
         }
         return position_map.get(position, position_map['top'])[axis]
     
+    def _get_aggregation(self, custom_config: Dict, default: str = 'sum') -> str:
+        """获取并校验聚合方式"""
+        aggregation = (custom_config or {}).get('aggregation', default)
+        if aggregation not in self.supported_aggregations:
+            raise ValueError(f"不支持的聚合方式: {aggregation}，支持: {', '.join(self.supported_aggregations)}")
+        return aggregation
+    
+    def _to_frame(self, data: ChartInput) -> pd.DataFrame:
+        """将输入数据统一转换为DataFrame，只在入口处调用一次"""
+        if isinstance(data, pd.DataFrame):
+            return data
+        if isinstance(data, dict):
+            # {列名: 数组}形式的列式数据，直接按列构建
+            return pd.DataFrame({name: np.asarray(values) for name, values in data.items()})
+        return pd.DataFrame.from_records(data) if data else pd.DataFrame()
+    
+    def _numeric_column(self, df: pd.DataFrame, name: str) -> np.ndarray:
+        """按列名取出数值数组，无法转换的值和缺失的列均为NaN"""
+        if name not in df:
+            return np.full(len(df), np.nan)
+        return pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=float)
+    
+    def _aggregate_by_category(self, df: pd.DataFrame, category_name: str, value_names: List[str], aggregation: str = 'sum', as_lists: bool = True):
+        """
+        按类别列分组聚合数值列
+        
+        Args:
+            df: 数据
+            category_name: 类别列名
+            value_names: 数值列名列表
+            aggregation: 聚合方式
+            as_lists: 为False时返回类别Index和聚合结果DataFrame，便于继续做数组运算
+            
+        Returns:
+            (按首次出现顺序排列的类别列表, {数值列名: 与类别对齐的聚合值列表})
+        """
+        category = df[category_name] if category_name in df else pd.Series('', index=df.index)
+        
+        # factorize按首次出现顺序编码，空类别编码为-1
+        codes, categories = pd.factorize(category, sort=False)
+        valid = codes >= 0
+        
+        values = pd.DataFrame({
+            name: pd.to_numeric(df[name], errors='coerce').to_numpy()[valid] if name in df else 0
+            for name in value_names
+        }, index=pd.RangeIndex(int(valid.sum())))
+        grouped = values.groupby(codes[valid], sort=True)
+        
+        if aggregation == 'count':
+            sizes = grouped.size()
+            result = pd.DataFrame({name: sizes for name in value_names})
+        else:
+            result = grouped.agg(aggregation)
+        
+        if not as_lists:
+            return categories, result
+        return categories.tolist(), {name: self._to_json_list(result[name]) for name in value_names}
+    
+    def _top_n_with_other(self, names: List, values: List, top_n: int, other_value: Callable[[List], Any] = None,
+                          other_label: str = '其他'):
+        """
+        保留数值最大的N个类别，其余类别合并为一个“其他”项
+        
+        使用argpartition选出前N项，只对这N项排序，复杂度为O(n + N log N)
+        
+        Args:
+            names: 类别列表（已聚合，类别唯一）
+            values: 与类别对齐的数值列表
+            top_n: 保留的类别数量
+            other_value: 根据被合并的类别列表计算“其他”项数值，默认对聚合值求和（仅适用于求和聚合）
+            other_label: 合并项名称
+            
+        Returns:
+            (类别列表, 数值列表)，按数值降序，“其他”项位于末尾
+        """
+        top_n = int(top_n)
+        if top_n < 1:
+            raise ValueError("topN必须为正整数")
+        if len(names) <= top_n:
+            return names, values
+        
+        numeric = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=float)
+        ranking = np.where(np.isnan(numeric), -np.inf, numeric)
+        
+        top = np.argpartition(-ranking, top_n - 1)[:top_n]
+        top = top[np.argsort(-ranking[top], kind='stable')]
+        
+        rest = np.ones(len(names), dtype=bool)
+        rest[top] = False
+        if other_value is None:
+            other = np.nansum(numeric[rest]).item()
+        else:
+            other = other_value([names[i] for i in np.flatnonzero(rest)])
+        
+        return [names[i] for i in top] + [other_label], [values[i] for i in top] + [other]
+    
+    def _aggregate_rows(self, df: pd.DataFrame, category_name: str, value_name: str, categories: List,
+                        aggregation: str):
+        """用指定聚合方式重新聚合属于若干类别的原始行（用于“其他”项）"""
+        mask = df[category_name].isin(categories) if category_name in df else pd.Series(False, index=df.index)
+        if aggregation == 'count':
+            return int(mask.sum())
+        values = pd.to_numeric(df.loc[mask, value_name], errors='coerce') if value_name in df else pd.Series(dtype=float)
+        result = values.agg(aggregation)
+        return None if pd.isna(result) else float(result)
+    
+    def _to_json_list(self, values: pd.Series) -> List:
+        """将数值序列转换为列表，缺失值转换为None"""
+        return values.astype(object).where(values.notna(), None).tolist()
+    
+    def _get_zoom_window(self, custom_config: Dict, length: int):
+        """将缩放窗口（百分比start/end，与ECharts dataZoom一致）转换为下标区间，未缩放时返回None"""
+        zoom = (custom_config or {}).get('zoom')
+        if not zoom:
+            return None
+        start = max(0.0, min(100.0, float(zoom.get('start', 0))))
+        end = max(start, min(100.0, float(zoom.get('end', 100))))
+        return int(np.floor(length * start / 100)), int(np.ceil(length * end / 100))
+    
+    def _downsample_line(self, y: np.ndarray, custom_config: Dict) -> np.ndarray:
+        """
+        折线/面积图降采样，返回保留点的下标
+        
+        - zoom: 返回缩放窗口内的全分辨率数据
+        - downsample: lttb（默认）、minmax（每像素桶保留最小/最大值）或none
+        - width: 图表像素宽度，决定目标点数
+        """
+        custom_config = custom_config or {}
+        
+        window = self._get_zoom_window(custom_config, len(y))
+        if window is not None:
+            start, end = window
+            return np.arange(start, min(end, len(y)))
+        
+        method = custom_config.get('downsample', 'lttb')
+        if method not in DOWNSAMPLE_METHODS:
+            raise ValueError(f"不支持的降采样方式: {method}，支持: {', '.join(DOWNSAMPLE_METHODS)}")
+        
+        width = int(custom_config.get('width') or 800)
+        if method == 'none' or len(y) <= width:
+            return np.arange(len(y))
+        
+        if method == 'lttb':
+            return lttb_indices(y, width)
+        return minmax_indices(y, width // 2)
+    
+    def _thin_scatter(self, x: np.ndarray, y: np.ndarray, custom_config: Dict, symbol_size: int,
+                      weights: np.ndarray = None) -> np.ndarray:
+        """
+        散点图网格抽稀，返回保留点的下标
+        
+        - zoom: 返回x轴缩放窗口（百分比）内的全部点
+        - downsample: 为none时不抽稀
+        - width/height: 图表像素尺寸，网格边长为半个散点大小
+        - weights: 指定时每个网格保留权重最大的点
+        """
+        custom_config = custom_config or {}
+        
+        if custom_config.get('zoom'):
+            finite_x = x[np.isfinite(x)]
+            if len(finite_x) == 0:
+                return np.arange(len(x))
+            x_min, x_max = finite_x.min(), finite_x.max()
+            zoom = custom_config['zoom']
+            low = x_min + (x_max - x_min) * float(zoom.get('start', 0)) / 100
+            high = x_min + (x_max - x_min) * float(zoom.get('end', 100)) / 100
+            return np.flatnonzero((x >= low) & (x <= high))
+        
+        cell = max(1, symbol_size // 2)
+        cols = max(1, int(custom_config.get('width') or 800) // cell)
+        rows = max(1, int(custom_config.get('height') or 600) // cell)
+        
+        if custom_config.get('downsample') == 'none' or len(x) <= cols * rows:
+            return np.arange(len(x))
+        
+        return grid_thin_indices(x, y, cols, rows, weights)
+    
     def _find_column_by_type(self, columns: List[Dict], data_type: str) -> Dict:
         """根据类型查找列"""
         for col in columns:
@@ -127,13 +506,15 @@ class ChartGenerator:
                 return col
         return columns[0] if columns else {'name': 'default', 'type': 'string'}
     
-    def _generate_bar_chart(self, data: List[Dict], columns: List[Dict], base_config: Dict, is_horizontal: bool = False) -> Dict:
+    def _generate_bar_chart(self, df: pd.DataFrame, columns: List[Dict], base_config: Dict, is_horizontal: bool = False, custom_config: Dict = None) -> Dict:
         """生成条形图/柱状图配置"""
         category_col = self._find_column_by_type(columns, 'string')
         value_col = self._find_column_by_type(columns, 'number')
         
-        categories = [row.get(category_col['name'], '') for row in data]
-        values = [row.get(value_col['name'], 0) for row in data]
+        categories, aggregated = self._aggregate_by_category(
+            df, category_col['name'], [value_col['name']], self._get_aggregation(custom_config)
+        )
+        values = aggregated[value_col['name']]
         
         config = base_config.copy()
         config.update({
@@ -156,15 +537,22 @@ class ChartGenerator:
         
         return config
     
-    def _generate_line_chart(self, data: List[Dict], columns: List[Dict], base_config: Dict) -> Dict:
+    def _generate_line_chart(self, df: pd.DataFrame, columns: List[Dict], base_config: Dict, custom_config: Dict = None) -> Dict:
         """生成折线图配置"""
         x_col = self._find_column_by_type(columns, 'date')
         if x_col['type'] != 'date':
             x_col = self._find_column_by_type(columns, 'string')
         y_col = self._find_column_by_type(columns, 'number')
         
-        x_data = [row.get(x_col['name'], '') for row in data]
-        y_data = [row.get(y_col['name'], 0) for row in data]
+        categories, aggregated = self._aggregate_by_category(
+            df, x_col['name'], [y_col['name']], self._get_aggregation(custom_config), as_lists=False
+        )
+        y_values = aggregated[y_col['name']]
+        
+        # 先在数组上降采样，再转换为列表
+        indices = self._downsample_line(y_values.to_numpy(dtype=float), custom_config)
+        x_data = categories[indices].tolist()
+        y_data = self._to_json_list(y_values.iloc[indices])
         
         config = base_config.copy()
         config.update({
@@ -187,17 +575,24 @@ class ChartGenerator:
         
         return config
     
-    def _generate_pie_chart(self, data: List[Dict], columns: List[Dict], base_config: Dict) -> Dict:
+    def _generate_pie_chart(self, df: pd.DataFrame, columns: List[Dict], base_config: Dict, custom_config: Dict = None) -> Dict:
         """生成饼图配置"""
         name_col = self._find_column_by_type(columns, 'string')
         value_col = self._find_column_by_type(columns, 'number')
         
+        aggregation = self._get_aggregation(custom_config)
+        names, aggregated = self._aggregate_by_category(df, name_col['name'], [value_col['name']], aggregation)
+        values = aggregated[value_col['name']]
+        if (custom_config or {}).get('topN'):
+            # “其他”项由被合并类别的原始行按同一聚合方式重新计算
+            names, values = self._top_n_with_other(
+                names, values, custom_config['topN'],
+                lambda rest: self._aggregate_rows(df, name_col['name'], value_col['name'], rest, aggregation)
+            )
+        
         pie_data = [
-            {
-                'name': row.get(name_col['name'], ''),
-                'value': row.get(value_col['name'], 0)
-            }
-            for row in data
+            {'name': name, 'value': value}
+            for name, value in zip(names, values)
         ]
         
         config = base_config.copy()
@@ -228,18 +623,26 @@ class ChartGenerator:
         
         return config
     
-    def _generate_scatter_chart(self, data: List[Dict], columns: List[Dict], base_config: Dict) -> Dict:
+    def _generate_scatter_chart(self, df: pd.DataFrame, columns: List[Dict], base_config: Dict, custom_config: Dict = None) -> Dict:
         """生成散点图配置"""
         numeric_cols = [col for col in columns if col.get('type') == 'number']
         if len(numeric_cols) < 2:
-            return self._generate_bar_chart(data, columns, base_config)
+            return self._generate_bar_chart(df, columns, base_config, False, custom_config)
         
         x_col = numeric_cols[0]
         y_col = numeric_cols[1]
+        symbol_size = 8
+        
+        x = self._numeric_column(df, x_col['name'])
+        y = self._numeric_column(df, y_col['name'])
         
+        indices = self._thin_scatter(x, y, custom_config, symbol_size)
         scatter_data = [
-            [row.get(x_col['name'], 0), row.get(y_col['name'], 0)]
-            for row in data
+            list(point)
+            for point in zip(
+                self._to_json_list(pd.Series(x[indices])),
+                self._to_json_list(pd.Series(y[indices]))
+            )
         ]
         
         config = base_config.copy()
@@ -260,47 +663,53 @@ class ChartGenerator:
                 'name': f"{x_col['name']} vs {y_col['name']}",
                 'type': 'scatter',
                 'data': scatter_data,
-                'symbolSize': 8,
+                'symbolSize': symbol_size,
                 'emphasis': {'focus': 'series'}
             }]
         })
         
         return config
     
-    def _generate_area_chart(self, data: List[Dict], columns: List[Dict], base_config: Dict) -> Dict:
+    def _generate_area_chart(self, df: pd.DataFrame, columns: List[Dict], base_config: Dict, custom_config: Dict = None) -> Dict:
         """生成面积图配置"""
-        config = self._generate_line_chart(data, columns, base_config)
+        config = self._generate_line_chart(df, columns, base_config, custom_config)
         
         # 为系列添加面积样式
         config['series'][0]['areaStyle'] = {'opacity': 0.6}
         
         return config
     
-    def _generate_radar_chart(self, data: List[Dict], columns: List[Dict], base_config: Dict) -> Dict:
+    def _generate_radar_chart(self, df: pd.DataFrame, columns: List[Dict], base_config: Dict) -> Dict:
         """生成雷达图配置"""
         numeric_cols = [col for col in columns if col.get('type') == 'number']
         
         if len(numeric_cols) < 3:
-            return self._generate_bar_chart(data, columns, base_config)
+            return self._generate_bar_chart(df, columns, base_config)
+        
+        names = [col['name'] for col in numeric_cols]
+        values = pd.DataFrame({
+            name: pd.to_numeric(df[name], errors='coerce') if name in df else pd.Series(0, index=df.index)
+            for name in names
+        })
         
         # 计算每个指标的最大值
-        indicators = []
-        for col in numeric_cols:
-            values = [row.get(col['name'], 0) for row in data if row.get(col['name']) is not None]
-            max_val = max(values) if values else 100
-            indicators.append({
-                'name': col['name'],
-                'max': max_val * 1.2
-            })
-        
-        # 生成雷达数据
-        radar_data = []
-        for i, row in enumerate(data[:5]):  # 限制显示前5行
-            values = [row.get(col['name'], 0) for col in numeric_cols]
-            radar_data.append({
-                'value': values,
+        max_values = values.max()
+        indicators = [
+            {
+                'name': name,
+                'max': (max_values[name] if pd.notna(max_values[name]) else 100) * 1.2
+            }
+            for name in names
+        ]
+        
+        # 生成雷达数据，限制显示前5行
+        radar_data = [
+            {
+                'value': row,
                 'name': f'数据{i+1}'
-            })
+            }
+            for i, row in enumerate(values.head(5).fillna(0).values.tolist())
+        ]
         
         config = base_config.copy()
         config.update({
@@ -321,34 +730,46 @@ class ChartGenerator:
         
         return config
     
-    def _generate_heatmap_chart(self, data: List[Dict], columns: List[Dict], base_config: Dict) -> Dict:
-        """生成热力图配置"""
+    def _generate_heatmap_chart(self, df: pd.DataFrame, columns: List[Dict], base_config: Dict, custom_config: Dict = None) -> Dict:
+        """生成热力图配置，按(x, y)单元格聚合数值，只输出非空单元格"""
         if len(columns) < 3:
-            return self._generate_bar_chart(data, columns, base_config)
+            return self._generate_bar_chart(df, columns, base_config)
         
         x_col = columns[0]
         y_col = columns[1]
         value_col = self._find_column_by_type(columns, 'number')
+        aggregation = self._get_aggregation(custom_config)
+        
+        x_series = df[x_col['name']] if x_col['name'] in df else pd.Series('', index=df.index)
+        y_series = df[y_col['name']] if y_col['name'] in df else pd.Series('', index=df.index)
         
-        # 获取唯一的x和y值
-        x_values = list(set(row.get(x_col['name'], '') for row in data))
-        y_values = list(set(row.get(y_col['name'], '') for row in data))
-        
-        # 生成热力图数据
-        heatmap_data = []
-        for i, x_val in enumerate(x_values):
-            for j, y_val in enumerate(y_values):
-                # 查找对应的值
-                value = 0
-                for row in data:
-                    if row.get(x_col['name']) == x_val and row.get(y_col['name']) == y_val:
-                        value = row.get(value_col['name'], 0)
-                        break
-                heatmap_data.append([i, j, value])
-        
-        values = [item[2] for item in heatmap_data]
-        min_val = min(values) if values else 0
-        max_val = max(values) if values else 100
+        # 按首次出现顺序确定类别，保证轴顺序稳定
+        x_values = pd.unique(x_series.dropna())
+        y_values = pd.unique(y_series.dropna())
+        x_codes = pd.Categorical(x_series, categories=x_values).codes
+        y_codes = pd.Categorical(y_series, categories=y_values).codes
+        
+        valid = (x_codes >= 0) & (y_codes >= 0)
+        cells = pd.DataFrame({'x': x_codes[valid], 'y': y_codes[valid]})
+        grouped = cells.groupby(['x', 'y'], sort=True)
+        
+        if aggregation == 'count':
+            cell_values = grouped.size()
+        else:
+            values = df[value_col['name']] if value_col['name'] in df else pd.Series(np.nan, index=df.index)
+            cells['value'] = pd.to_numeric(values, errors='coerce').to_numpy()[valid]
+            cell_values = grouped['value'].agg(aggregation).dropna()
+        
+        # 稀疏输出：仅包含有数据的单元格
+        heatmap_data = [
+            [i, j, value]
+            for (i, j), value in zip(cell_values.index.tolist(), cell_values.tolist())
+        ]
+        
+        min_val = cell_values.min().item() if len(cell_values) else 0
+        max_val = cell_values.max().item() if len(cell_values) else 100
+        x_values = x_values.tolist()
+        y_values = y_values.tolist()
         
         config = base_config.copy()
         config.update({
@@ -384,21 +805,28 @@ class ChartGenerator:
         
         return config
     
-    def _generate_funnel_chart(self, data: List[Dict], columns: List[Dict], base_config: Dict) -> Dict:
+    def _generate_funnel_chart(self, df: pd.DataFrame, columns: List[Dict], base_config: Dict, custom_config: Dict = None) -> Dict:
         """生成漏斗图配置"""
         name_col = self._find_column_by_type(columns, 'string')
         value_col = self._find_column_by_type(columns, 'number')
         
+        aggregation = self._get_aggregation(custom_config)
+        names, aggregated = self._aggregate_by_category(df, name_col['name'], [value_col['name']], aggregation)
+        values = aggregated[value_col['name']]
+        if (custom_config or {}).get('topN'):
+            # “其他”项由被合并类别的原始行按同一聚合方式重新计算
+            names, values = self._top_n_with_other(
+                names, values, custom_config['topN'],
+                lambda rest: self._aggregate_rows(df, name_col['name'], value_col['name'], rest, aggregation)
+            )
+        
         funnel_data = [
-            {
-                'name': row.get(name_col['name'], ''),
-                'value': row.get(value_col['name'], 0)
-            }
-            for row in data
+            {'name': name, 'value': value}
+            for name, value in zip(names, values)
         ]
         
         # 按值排序
-        funnel_data.sort(key=lambda x: x['value'], reverse=True)
+        funnel_data.sort(key=lambda x: x['value'] if x['value'] is not None else float('-inf'), reverse=True)
         
         config = base_config.copy()
         config.update({
@@ -424,33 +852,413 @@ class ChartGenerator:
         
         return config
     
-    def _generate_stacked_bar_chart(self, data: List[Dict], columns: List[Dict], base_config: Dict) -> Dict:
+    def _generate_boxplot_chart(self, df: pd.DataFrame, columns: List[Dict], base_config: Dict, custom_config: Dict = None) -> Dict:
+        """生成箱线图配置，每个数值列一个箱体，只输出统计量"""
+        numeric_cols = [col for col in columns if col.get('type') == 'number']
+        if not numeric_cols:
+            return self._generate_bar_chart(df, columns, base_config, False, custom_config)
+        
+        names = []
+        boxes = []
+        outliers = []
+        for col in numeric_cols:
+            stats = box_plot_stats(self._numeric_column(df, col['name']))
+            if stats is None:
+                continue
+            index = len(names)
+            names.append(col['name'])
+            boxes.append([stats['low'], stats['q1'], stats['median'], stats['q3'], stats['high']])
+            outliers.extend([index, value] for value in stats['outliers'])
+        
+        config = base_config.copy()
+        config.update({
+            'tooltip': {
+                'trigger': 'item'
+            },
+            'xAxis': {
+                'type': 'category',
+                'data': names,
+                'boundaryGap': True
+            },
+            'yAxis': {
+                'type': 'value',
+                'scale': True
+            },
+            'series': [
+                {
+                    'name': '箱线图',
+                    'type': 'boxplot',
+                    'data': boxes
+                },
+                {
+                    'name': '异常值',
+                    'type': 'scatter',
+                    'data': outliers,
+                    'symbolSize': 6
+                }
+            ]
+        })
+        
+        return config
+    
+    def _generate_histogram_chart(self, df: pd.DataFrame, columns: List[Dict], base_config: Dict, custom_config: Dict = None) -> Dict:
+        """生成直方图配置，分箱在服务端完成"""
+        custom_config = custom_config or {}
+        numeric_cols = [col for col in columns if col.get('type') == 'number']
+        if not numeric_cols:
+            return self._generate_bar_chart(df, columns, base_config, False, custom_config)
+        
+        value_col = next((col for col in numeric_cols if col['name'] == custom_config.get('column')), numeric_cols[0])
+        
+        values = self._numeric_column(df, value_col['name'])
+        edges, counts = histogram(values, custom_config.get('bins', 'fd'))
+        
+        labels = [f"{low:.4g}~{high:.4g}" for low, high in zip(edges[:-1].tolist(), edges[1:].tolist())]
+        
+        config = base_config.copy()
+        config.update({
+            'xAxis': {
+                'type': 'category',
+                'data': labels,
+                'name': value_col['name']
+            },
+            'yAxis': {
+                'type': 'value',
+                'name': '频数'
+            },
+            'series': [{
+                'name': value_col['name'],
+                'type': 'bar',
+                'data': counts.tolist(),
+                'barWidth': '99%',
+                'emphasis': {'focus': 'series'}
+            }]
+        })
+        
+        return config
+    
+    def _generate_waterfall_chart(self, df: pd.DataFrame, columns: List[Dict], base_config: Dict, custom_config: Dict = None) -> Dict:
+        """生成瀑布图配置，透明辅助系列承托增减量"""
+        category_col = self._find_column_by_type(columns, 'string')
+        value_col = self._find_column_by_type(columns, 'number')
+        
+        categories, aggregated = self._aggregate_by_category(
+            df, category_col['name'], [value_col['name']], self._get_aggregation(custom_config)
+        )
+        values = pd.to_numeric(pd.Series(aggregated[value_col['name']], dtype=object), errors='coerce').fillna(0).to_numpy(dtype=float)
+        
+        # 每一步之前的累计值
+        totals = np.concatenate([[0.0], np.cumsum(values)[:-1]])
+        placeholder = np.where(values >= 0, totals, totals + values)
+        increase = np.where(values >= 0, values, 0.0)
+        decrease = np.where(values < 0, -values, 0.0)
+        
+        config = base_config.copy()
+        config.update({
+            'xAxis': {
+                'type': 'category',
+                'data': categories
+            },
+            'yAxis': {
+                'type': 'value'
+            },
+            'series': [
+                {
+                    'name': '辅助',
+                    'type': 'bar',
+                    'stack': 'total',
+                    'itemStyle': {'borderColor': 'transparent', 'color': 'transparent'},
+                    'emphasis': {'itemStyle': {'borderColor': 'transparent', 'color': 'transparent'}},
+                    'tooltip': {'show': False},
+                    'data': placeholder.tolist()
+                },
+                {
+                    'name': '增加',
+                    'type': 'bar',
+                    'stack': 'total',
+                    'data': increase.tolist()
+                },
+                {
+                    'name': '减少',
+                    'type': 'bar',
+                    'stack': 'total',
+                    'data': decrease.tolist()
+                }
+            ]
+        })
+        config['legend'] = {**config['legend'], 'data': ['增加', '减少']}
+        
+        return config
+    
+    def _generate_treemap_chart(self, df: pd.DataFrame, columns: List[Dict], base_config: Dict, custom_config: Dict = None) -> Dict:
+        """生成树形图配置，按文本列逐级分组构建层级"""
+        string_cols = [col['name'] for col in columns if col.get('type') == 'string']
+        value_col = self._find_column_by_type(columns, 'number')
+        if not string_cols:
+            return self._generate_bar_chart(df, columns, base_config, False, custom_config)
+        
+        levels = [name for name in string_cols[:int((custom_config or {}).get('levels', 3))] if name in df]
+        if not levels:
+            return self._generate_bar_chart(df, columns, base_config, False, custom_config)
+        
+        frame = df[levels].copy()
+        if value_col.get('type') == 'number' and value_col['name'] in df:
+            frame['__value__'] = pd.to_numeric(df[value_col['name']], errors='coerce')
+            leaf_values = frame.groupby(levels, sort=False, dropna=True)['__value__'].sum()
+        else:
+            leaf_values = frame.groupby(levels, sort=False, dropna=True).size()
+        
+        # 只遍历分组结果（而非原始行）构建嵌套结构
+        root = {'children': {}}
+        for keys, value in zip(leaf_values.index.tolist(), leaf_values.tolist()):
+            keys = keys if isinstance(keys, tuple) else (keys,)
+            node = root
+            for key in keys:
+                node = node['children'].setdefault(key, {'name': key, 'value': 0, 'children': {}})
+                node['value'] += value
+        
+        def to_list(children: Dict) -> List[Dict]:
+            items = []
+            for child in children.values():
+                item = {'name': child['name'], 'value': child['value']}
+                if child['children']:
+                    item['children'] = to_list(child['children'])
+                items.append(item)
+            return items
+        
+        config = base_config.copy()
+        config.update({
+            'tooltip': {
+                'trigger': 'item',
+                'formatter': '{b}: {c}'
+            },
+            'series': [{
+                'name': value_col['name'] if value_col.get('type') == 'number' else '计数',
+                'type': 'treemap',
+                'data': to_list(root['children'])
+            }]
+        })
+        if len(levels) > 1:
+            # 多级时默认只展开第一级，点击下钻
+            config['series'][0]['leafDepth'] = 1
+        
+        # 删除不适用的配置
+        config.pop('xAxis', None)
+        config.pop('yAxis', None)
+        config.pop('grid', None)
+        
+        return config
+    
+    def _generate_bubble_chart(self, df: pd.DataFrame, columns: List[Dict], base_config: Dict, custom_config: Dict = None) -> Dict:
+        """生成泡泡图配置，第三个数值列按面积映射为气泡大小"""
+        custom_config = custom_config or {}
+        numeric_cols = [col for col in columns if col.get('type') == 'number']
+        if len(numeric_cols) < 3:
+            return self._generate_scatter_chart(df, columns, base_config, custom_config)
+        
+        x_col, y_col, size_col = numeric_cols[:3]
+        min_size = float(custom_config.get('minBubbleSize', 6))
+        max_size = float(custom_config.get('maxBubbleSize', 40))
+        
+        x = self._numeric_column(df, x_col['name'])
+        y = self._numeric_column(df, y_col['name'])
+        size = self._numeric_column(df, size_col['name'])
+        
+        # 与散点图相同按网格抽稀（downsample为none时不抽稀），每个网格保留最大的气泡
+        indices = self._thin_scatter(x, y, custom_config, int(max_size), weights=np.abs(size))
+        x, y, size = x[indices], y[indices], size[indices]
+        
+        # 面积与数值成正比：半径取平方根后线性缩放到[min_size, max_size]
+        radius = np.sqrt(np.abs(np.nan_to_num(size)))
+        span = radius.max() - radius.min() if len(radius) else 0
+        scaled = min_size + (radius - radius.min()) / span * (max_size - min_size) if span > 0 \
+            else np.full(len(radius), (min_size + max_size) / 2)
+        
+        bubble_data = [
+            {'value': [xv, yv, sv], 'symbolSize': round(px, 1)}
+            for xv, yv, sv, px in zip(
+                self._to_json_list(pd.Series(x)),
+                self._to_json_list(pd.Series(y)),
+                self._to_json_list(pd.Series(size)),
+                scaled.tolist()
+            )
+        ]
+        
+        config = base_config.copy()
+        config.update({
+            'tooltip': {
+                'trigger': 'item'
+            },
+            'xAxis': {
+                'type': 'value',
+                'name': x_col['name'],
+                'nameLocation': 'middle',
+                'nameGap': 30,
+                'scale': True
+            },
+            'yAxis': {
+                'type': 'value',
+                'name': y_col['name'],
+                'nameLocation': 'middle',
+                'nameGap': 50,
+                'scale': True
+            },
+            'series': [{
+                'name': size_col['name'],
+                'type': 'scatter',
+                'data': bubble_data,
+                'emphasis': {'focus': 'series'}
+            }]
+        })
+        
+        return config
+    
+    def _generate_sankey_chart(self, df: pd.DataFrame, columns: List[Dict], base_config: Dict, custom_config: Dict = None) -> Dict:
+        """生成桑基图配置，按(来源, 去向)两列聚合边权重"""
+        string_cols = [col['name'] for col in columns if col.get('type') == 'string']
+        value_col = self._find_column_by_type(columns, 'number')
+        if len(string_cols) < 2 or string_cols[0] not in df or string_cols[1] not in df:
+            return self._generate_bar_chart(df, columns, base_config, False, custom_config)
+        
+        source_name, target_name = string_cols[:2]
+        frame = pd.DataFrame({
+            'source': df[source_name].astype(object),
+            'target': df[target_name].astype(object)
+        }).dropna()
+        if value_col.get('type') == 'number' and value_col['name'] in df:
+            frame['value'] = pd.to_numeric(df[value_col['name']], errors='coerce')
+            edges = frame.groupby(['source', 'target'], sort=False)['value'].sum()
+        else:
+            edges = frame.groupby(['source', 'target'], sort=False).size()
+        
+        sources = edges.index.get_level_values(0).astype(str)
+        targets = edges.index.get_level_values(1).astype(str)
+        
+        # 桑基图不允许环路，两列同名节点时为去向节点加上列名区分
+        overlap = set(sources) & set(targets)
+        if overlap:
+            targets = pd.Index([f"{t} ({target_name})" if t in overlap else t for t in targets])
+        
+        node_names = pd.unique(np.concatenate([sources.to_numpy(), targets.to_numpy()]))
+        links = [
+            {'source': s, 'target': t, 'value': v}
+            for s, t, v in zip(sources.tolist(), targets.tolist(), self._to_json_list(pd.Series(edges.to_numpy())))
+        ]
+        
+        config = base_config.copy()
+        config.update({
+            'tooltip': {
+                'trigger': 'item',
+                'triggerOn': 'mousemove'
+            },
+            'series': [{
+                'name': f"{source_name} → {target_name}",
+                'type': 'sankey',
+                'emphasis': {'focus': 'adjacency'},
+                'data': [{'name': name} for name in node_names.tolist()],
+                'links': links
+            }]
+        })
+        
+        # 删除不适用的配置
+        config.pop('xAxis', None)
+        config.pop('yAxis', None)
+        config.pop('grid', None)
+        
+        return config
+    
+    def _generate_rose_chart(self, df: pd.DataFrame, columns: List[Dict], base_config: Dict, custom_config: Dict = None) -> Dict:
+        """生成玫瑰图（南丁格尔图）配置，复用饼图的聚合与Top-N合并"""
+        config = self._generate_pie_chart(df, columns, base_config, custom_config)
+        
+        config['series'][0].update({
+            'roseType': 'area',
+            'radius': ['15%', '70%']
+        })
+        
+        return config
+    
+    def _generate_dual_axis_chart(self, df: pd.DataFrame, columns: List[Dict], base_config: Dict, custom_config: Dict = None) -> Dict:
+        """生成双轴图配置，第一个数值列为柱（左轴），第二个数值列为折线（右轴）"""
+        numeric_cols = [col for col in columns if col.get('type') == 'number']
+        if len(numeric_cols) < 2:
+            return self._generate_line_chart(df, columns, base_config, custom_config)
+        
+        x_col = self._find_column_by_type(columns, 'date')
+        if x_col['type'] != 'date':
+            x_col = self._find_column_by_type(columns, 'string')
+        left_col, right_col = numeric_cols[:2]
+        
+        categories, aggregated = self._aggregate_by_category(
+            df, x_col['name'], [left_col['name'], right_col['name']], self._get_aggregation(custom_config), as_lists=False
+        )
+        left_values = aggregated[left_col['name']]
+        right_values = aggregated[right_col['name']]
+        
+        # 两个系列共用类目轴，取两者降采样保留下标的并集
+        indices = np.union1d(
+            self._downsample_line(left_values.to_numpy(dtype=float), custom_config),
+            self._downsample_line(right_values.to_numpy(dtype=float), custom_config)
+        )
+        
+        config = base_config.copy()
+        config.update({
+            'xAxis': {
+                'type': 'category',
+                'data': categories[indices].tolist()
+            },
+            'yAxis': [
+                {
+                    'type': 'value',
+                    'name': left_col['name'],
+                    'position': 'left'
+                },
+                {
+                    'type': 'value',
+                    'name': right_col['name'],
+                    'position': 'right'
+                }
+            ],
+            'series': [
+                {
+                    'name': left_col['name'],
+                    'type': 'bar',
+                    'yAxisIndex': 0,
+                    'data': self._to_json_list(left_values.iloc[indices])
+                },
+                {
+                    'name': right_col['name'],
+                    'type': 'line',
+                    'yAxisIndex': 1,
+                    'smooth': True,
+                    'data': self._to_json_list(right_values.iloc[indices])
+                }
+            ]
+        })
+        
+        return config
+    
+    def _generate_stacked_bar_chart(self, df: pd.DataFrame, columns: List[Dict], base_config: Dict, custom_config: Dict = None) -> Dict:
         """生成堆积条形图配置"""
         category_col = self._find_column_by_type(columns, 'string')
         numeric_cols = [col for col in columns if col.get('type') == 'number']
         
         if len(numeric_cols) < 2:
-            return self._generate_bar_chart(data, columns, base_config)
+            return self._generate_bar_chart(df, columns, base_config, False, custom_config)
         
-        categories = list(set(row.get(category_col['name'], '') for row in data))
+        categories, aggregated = self._aggregate_by_category(
+            df, category_col['name'], [col['name'] for col in numeric_cols], self._get_aggregation(custom_config)
+        )
         
-        series = []
-        for col in numeric_cols:
-            col_data = []
-            for cat in categories:
-                value = 0
-                for row in data:
-                    if row.get(category_col['name']) == cat:
-                        value = row.get(col['name'], 0)
-                        break
-                col_data.append(value)
-            
-            series.append({
+        series = [
+            {
                 'name': col['name'],
                 'type': 'bar',
                 'stack': 'total',
-                'data': col_data
-            })
+                'data': aggregated[col['name']]
+            }
+            for col in numeric_cols
+        ]
         
         config = base_config.copy()
         config.update({
@@ -466,9 +1274,9 @@ class ChartGenerator:
         
         return config
     
-    def _generate_stacked_area_chart(self, data: List[Dict], columns: List[Dict], base_config: Dict) -> Dict:
+    def _generate_stacked_area_chart(self, df: pd.DataFrame, columns: List[Dict], base_config: Dict, custom_config: Dict = None) -> Dict:
         """生成堆积面积图配置"""
-        config = self._generate_stacked_bar_chart(data, columns, base_config)
+        config = self._generate_stacked_bar_chart(df, columns, base_config, custom_config)
         
         # 转换为面积图
         for series_item in config['series']:
@@ -0,0 +1,42 @@
+from typing import Any, Dict
+
+# RFC 7386 JSON Merge Patch 的媒体类型
+MERGE_PATCH_MEDIA_TYPE = 'application/merge-patch+json'
+
+
+def merge_patch_diff(old: Any, new: Any) -> Any:
+    """
+    计算将old变为new的JSON Merge Patch（RFC 7386）
+
+    对象按键递归比较，被删除的键记为None，数组和标量整体替换。
+    注意：new中值为None的键在Merge Patch中表示删除，客户端应用后该键不存在。
+
+    Args:
+        old: 客户端持有的配置
+        new: 新配置
+
+    Returns:
+        Merge Patch对象，两者相同时返回空字典
+    """
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return new
+
+    patch: Dict[str, Any] = {}
+    for key in old:
+        if key not in new:
+            patch[key] = None
+
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+        elif old[key] is value:
+            # 来自同一缓存数据层的对象无需逐项比较
+            continue
+        elif old[key] != value:
+            if isinstance(old[key], dict) and isinstance(value, dict):
+                patch[key] = merge_patch_diff(old[key], value)
+            else:
+                patch[key] = value
+
+    return patch
+
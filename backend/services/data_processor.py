@@ -15,6 +15,19 @@ class DataProcessor:
     
     def __init__(self):
         self.supported_formats = ['.xlsx', '.xls', '.csv', '.tsv', '.ods']
+        
+        # 时间序列重采样频率
+        self.resample_frequencies = {
+            'day': 'D',
+            'week': 'W',
+            'month': 'M',
+            'quarter': 'Q',
+            'year': 'Y'
+        }
+        self.resample_aggregations = ['sum', 'mean', 'count', 'max', 'min', 'first', 'last']
+        
+        # 非数值列只能使用的重采样聚合方式
+        self.non_numeric_aggregations = ['count', 'first', 'last']
     
     async def analyze_file(self, content: bytes, filename: str) -> Tuple[pd.DataFrame, Dict]:
         """
@@ -263,4 +276,68 @@ class DataProcessor:
         }
         
         normalized = series.astype(str).str.lower().map(mapping)
-        return normalized
\ No newline at end of file
+        return normalized
+    
+    def resample_time_series(self, df: pd.DataFrame, columns_info: List[Dict], freq: str,
+                             date_column: str = None, aggregations: Any = None) -> Tuple[pd.DataFrame, List[Dict]]:
+        """
+        按日期列重采样并聚合数值列
+        
+        Args:
+            df: 清洗后的数据
+            columns_info: 列信息
+            freq: 重采样频率（day/week/month/quarter/year）
+            date_column: 日期列名，默认使用第一个日期列
+            aggregations: 聚合方式，可以是统一的字符串或{列名: 聚合方式}，默认对数值列求和；
+                非数值列只支持count、first、last，日期列不能作为聚合列
+            
+        Returns:
+            重采样后的DataFrame（每个时间桶一行，日期为桶起始时间）和对应的列信息
+        """
+        if freq not in self.resample_frequencies:
+            raise ValueError(f"不支持的重采样频率: {freq}，支持: {', '.join(self.resample_frequencies)}")
+        
+        if date_column is None:
+            date_column = next((col['name'] for col in columns_info if col['type'] == 'date'), None)
+        date_info = next((col for col in columns_info if col['name'] == date_column), None)
+        if date_info is None or date_info['type'] != 'date':
+            raise ValueError("未找到可用于重采样的日期列")
+        
+        if aggregations is not None and not isinstance(aggregations, (str, dict)):
+            raise ValueError("aggregations必须是字符串或{列名: 聚合方式}对象")
+        
+        numeric_columns = [col['name'] for col in columns_info if col['type'] == 'number' and col['name'] in df.columns]
+        if aggregations is None or isinstance(aggregations, str):
+            aggregations = {name: aggregations or 'sum' for name in numeric_columns}
+        
+        column_types = {col['name']: col['type'] for col in columns_info}
+        for name, aggregation in aggregations.items():
+            if name == date_column:
+                raise ValueError(f"日期列{name}用于分组，不能同时作为聚合列")
+            if name not in df.columns:
+                raise ValueError(f"列不存在: {name}")
+            if aggregation not in self.resample_aggregations:
+                raise ValueError(f"不支持的聚合方式: {aggregation}，支持: {', '.join(self.resample_aggregations)}")
+            if column_types.get(name) != 'number' and aggregation not in self.non_numeric_aggregations:
+                raise ValueError(
+                    f"非数值列{name}不支持聚合方式{aggregation}，支持: {', '.join(self.non_numeric_aggregations)}"
+                )
+        
+        # 按周期分组，向量化聚合
+        dates = pd.to_datetime(df[date_column], errors='coerce')
+        valid = dates.notna()
+        periods = dates[valid].dt.to_period(self.resample_frequencies[freq])
+        grouped = df.loc[valid, list(aggregations)].groupby(periods, sort=True)
+        resampled = grouped.agg(aggregations) if aggregations else pd.DataFrame(index=grouped.size().index)
+        
+        resampled.insert(0, date_column, resampled.index.to_timestamp())
+        resampled.reset_index(drop=True, inplace=True)
+        
+        resampled_columns = [date_info]
+        for name, aggregation in aggregations.items():
+            original = next((col for col in columns_info if col['name'] == name), {'name': name, 'type': 'number'})
+            col_type = 'number' if aggregation == 'count' else original['type']
+            resampled_columns.append({**original, 'type': col_type})
+        
+        logger.info(f"时间序列重采样完成: {len(df)}行 -> {len(resampled)}个{freq}桶")
+        return resampled, resampled_columns
@@ -0,0 +1,118 @@
+import logging
+import os
+import tempfile
+from typing import Dict, Iterator, List
+
+import pandas as pd
+
+from .export_service import ExportDependencyError
+from .serialization import dumps
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet/Arrow导出需要pyarrow
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+# 数据集导出支持的格式及MIME类型
+DATASET_EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.file'
+}
+
+# Arrow/Parquet schema元数据中保存列信息（类型、单位）的键
+COLUMNS_METADATA_KEY = b'ai_excel2graph.columns'
+
+
+class DatasetExporter:
+    """
+    清洗后数据集的批量导出
+
+    - CSV按行分块生成，适合流式返回
+    - Parquet和Arrow IPC直接由DataFrame的列数组构建，不经过逐行的Python对象
+    - 各列按DataProcessor推断的类型输出，列信息写入schema元数据
+    """
+
+    def __init__(self, csv_chunk_rows: int = 10000):
+        self.csv_chunk_rows = csv_chunk_rows
+
+    @property
+    def columnar_available(self) -> bool:
+        """Parquet/Arrow导出是否可用"""
+        return pa is not None
+
+    def iter_csv(self, df: pd.DataFrame, columns_info: List[Dict]) -> Iterator[bytes]:
+        """逐块生成CSV（UTF-8带BOM，便于Excel识别中文）"""
+        typed = self._typed_frame(df, columns_info)
+        yield '\ufeff'.encode('utf-8')
+        if typed.empty:
+            yield typed.to_csv(index=False).encode('utf-8')
+            return
+
+        for start in range(0, len(typed), self.csv_chunk_rows):
+            chunk = typed.iloc[start:start + self.csv_chunk_rows]
+            yield chunk.to_csv(index=False, header=start == 0, date_format='%Y-%m-%dT%H:%M:%S').encode('utf-8')
+
+    def write_columnar(self, df: pd.DataFrame, columns_info: List[Dict], format_type: str) -> str:
+        """
+        将数据集写入Parquet或Arrow IPC临时文件
+
+        Args:
+            df: 清洗后的数据
+            columns_info: 列信息
+            format_type: parquet或arrow
+
+        Returns:
+            临时文件路径，由调用方负责删除
+        """
+        if pa is None:
+            raise ExportDependencyError("Parquet/Arrow导出需要安装pyarrow")
+
+        table = self._to_table(df, columns_info)
+        fd, path = tempfile.mkstemp(suffix=f".{format_type}")
+        os.close(fd)
+        try:
+            if format_type == 'parquet':
+                pq.write_table(table, path, compression='snappy')
+            elif format_type == 'arrow':
+                with pa.OSFile(path, 'wb') as sink:
+                    with pa.ipc.new_file(sink, table.schema) as writer:
+                        writer.write_table(table)
+            else:
+                raise ValueError(f"不支持的数据集导出格式: {format_type}")
+        except Exception:
+            os.remove(path)
+            raise
+
+        logger.info(f"数据集导出完成: {format_type}, {table.num_rows}行, {os.path.getsize(path)} bytes")
+        return path
+
+    def _to_table(self, df: pd.DataFrame, columns_info: List[Dict]) -> "pa.Table":
+        table = pa.Table.from_pandas(self._typed_frame(df, columns_info), preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[COLUMNS_METADATA_KEY] = dumps(columns_info)
+        return table.replace_schema_metadata(metadata)
+
+    def _typed_frame(self, df: pd.DataFrame, columns_info: List[Dict]) -> pd.DataFrame:
+        """按列信息统一各列类型（数值列中的整数保持整数类型），无法转换的值置空"""
+        converted = {}
+        for col in columns_info:
+            name = col['name']
+            if name not in df.columns:
+                continue
+            series = df[name]
+            col_type = col.get('type')
+            if col_type == 'number' and not pd.api.types.is_numeric_dtype(series):
+                converted[name] = pd.to_numeric(series, errors='coerce')
+            elif col_type == 'date' and not pd.api.types.is_datetime64_any_dtype(series):
+                converted[name] = pd.to_datetime(series, errors='coerce')
+            elif col_type == 'boolean' and not pd.api.types.is_bool_dtype(series):
+                converted[name] = series.where(series.isin([True, False])).astype('boolean')
+            elif col_type == 'string' and not isinstance(series.dtype, pd.StringDtype):
+                # object列可能混有数值和文本，统一为字符串
+                converted[name] = series.astype('string')
+        return df.assign(**converted) if converted else df
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Any, Optional, AsyncIterator, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class RecommendationJob:
+    """后台图表推荐任务，记录状态并向订阅者推送事件"""
+
+    def __init__(self, dataset_id: str):
+        self.id = uuid.uuid4().hex
+        self.dataset_id = dataset_id
+        self.status = "pending"
+        self.recommendations: List[Dict] = []
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.updated_at = self.created_at
+        self.task: Optional[asyncio.Task] = None
+
+        # 事件日志，迟到的订阅者会先收到历史事件
+        self._events: List[Tuple[str, Any]] = []
+        self._condition = asyncio.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    async def publish(self, event: str, data: Any):
+        """记录事件并唤醒所有订阅者"""
+        async with self._condition:
+            self._events.append((event, data))
+            self.updated_at = datetime.now()
+            self._condition.notify_all()
+
+    async def add_recommendation(self, recommendation: Dict):
+        """追加一个推荐结果"""
+        self.status = "running"
+        self.recommendations.append(recommendation)
+        await self.publish("recommendation", recommendation)
+
+    async def complete(self):
+        """标记任务完成，推荐按分数排序"""
+        self.recommendations.sort(key=lambda x: x["score"], reverse=True)
+        self.status = "completed"
+        await self.publish("done", self.to_dict())
+
+    async def fail(self, error: str):
+        """标记任务失败"""
+        self.status = "failed"
+        self.error = error
+        await self.publish("error", self.to_dict())
+
+    async def events(self) -> AsyncIterator[Tuple[str, Any]]:
+        """订阅任务事件，直到任务结束"""
+        index = 0
+        while True:
+            async with self._condition:
+                await self._condition.wait_for(lambda: index < len(self._events))
+                pending = self._events[index:]
+
+            for event in pending:
+                yield event
+            index += len(pending)
+
+            if pending and pending[-1][0] in ("done", "error"):
+                return
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "dataset_id": self.dataset_id,
+            "status": self.status,
+            "recommendations": self.recommendations,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat()
+        }
+
+
+class DatasetStore:
+    """数据集存储，按LRU策略缓存清洗后的数据及其推荐任务"""
+
+    def __init__(self, max_datasets: int = 32):
+        self.max_datasets = max_datasets
+        self._datasets: "OrderedDict[str, Dict]" = OrderedDict()
+
+    def add(self, df: pd.DataFrame, columns_info: List[Dict], metadata: Dict) -> str:
+        """
+        保存清洗后的数据集
+
+        Args:
+            df: 清洗后的数据
+            columns_info: 列信息
+            metadata: 元数据
+
+        Returns:
+            数据集ID
+        """
+        dataset_id = uuid.uuid4().hex
+        self._datasets[dataset_id] = {
+            "id": dataset_id,
+            "df": df,
+            "columns": columns_info,
+            "metadata": metadata,
+            "recommendation_job": RecommendationJob(dataset_id),
+            # 图表类型 -> 缩略图生成任务
+            "thumbnails": {}
+        }
+
+        # 超出容量时淘汰最久未使用的数据集
+        while len(self._datasets) > self.max_datasets:
+            evicted_id, evicted = self._datasets.popitem(last=False)
+            tasks = [evicted["recommendation_job"].task, *evicted["thumbnails"].values()]
+            for task in tasks:
+                if task is not None and not task.done():
+                    task.cancel()
+            logger.info(f"淘汰数据集: {evicted_id}")
+
+        return dataset_id
+
+    def get(self, dataset_id: str) -> Optional[Dict]:
+        """获取数据集，不存在时返回None"""
+        dataset = self._datasets.get(dataset_id)
+        if dataset is not None:
+            self._datasets.move_to_end(dataset_id)
+        return dataset
+
+    def get_recommendation_job(self, dataset_id: str) -> Optional[RecommendationJob]:
+        """获取数据集的推荐任务"""
+        dataset = self.get(dataset_id)
+        return dataset["recommendation_job"] if dataset else None
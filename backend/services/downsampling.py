@@ -0,0 +1,125 @@
+from typing import Optional
+
+import numpy as np
+
+# 支持的折线/面积图降采样方式
+DOWNSAMPLE_METHODS = ['lttb', 'minmax', 'none']
+
+
+def lttb_indices(y: np.ndarray, threshold: int, x: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets降采样，返回保留点的下标
+
+    Args:
+        y: 纵轴数值
+        threshold: 目标点数
+        x: 横轴数值，默认使用下标
+
+    Returns:
+        升序排列的保留点下标
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+
+    # 首尾点固定保留，中间n-2个点分成threshold-2个桶
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # 下一个桶的平均点，最后一个桶使用末尾点
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return selected
+
+
+def minmax_indices(y: np.ndarray, buckets: int) -> np.ndarray:
+    """
+    按桶保留最小值和最大值（包络降采样），返回保留点的下标
+
+    Args:
+        y: 纵轴数值
+        buckets: 桶数量，每个桶最多保留2个点
+
+    Returns:
+        升序排列的保留点下标
+    """
+    n = len(y)
+    if buckets * 2 >= n or buckets < 1:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=float)
+    filled_low = np.where(np.isnan(y), np.inf, y)
+    filled_high = np.where(np.isnan(y), -np.inf, y)
+
+    edges = np.linspace(0, n, buckets + 1).astype(int)
+    indices = [0, n - 1]
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end <= start:
+            continue
+        indices.append(start + int(np.argmin(filled_low[start:end])))
+        indices.append(start + int(np.argmax(filled_high[start:end])))
+
+    return np.unique(indices)
+
+
+def grid_thin_indices(x: np.ndarray, y: np.ndarray, cols: int, rows: int,
+                      weights: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    网格分箱抽稀：每个网格单元只保留一个点，返回保留点的下标
+
+    Args:
+        x: 横轴数值
+        y: 纵轴数值
+        cols: 横向网格数
+        rows: 纵向网格数
+        weights: 点的权重（如气泡大小），指定时每个单元保留权重最大的点，否则保留第一个点
+
+    Returns:
+        升序排列的保留点下标
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid_idx = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    if len(valid_idx) == 0:
+        return valid_idx
+
+    vx = x[valid_idx]
+    vy = y[valid_idx]
+    x_span = (vx.max() - vx.min()) or 1.0
+    y_span = (vy.max() - vy.min()) or 1.0
+
+    gx = ((vx - vx.min()) / x_span * (cols - 1)).astype(np.int64)
+    gy = ((vy - vy.min()) / y_span * (rows - 1)).astype(np.int64)
+
+    cells = gx * rows + gy
+    if weights is None:
+        _, first = np.unique(cells, return_index=True)
+        return np.sort(valid_idx[first])
+
+    # 按(单元, 权重降序)排序，取每个单元的第一个点
+    w = np.nan_to_num(np.asarray(weights, dtype=float)[valid_idx], nan=-np.inf)
+    order = np.lexsort((-w, cells))
+    sorted_cells = cells[order]
+    first = order[np.r_[True, sorted_cells[1:] != sorted_cells[:-1]]]
+    return np.sort(valid_idx[first])
@@ -0,0 +1,56 @@
+import gzip
+import hashlib
+import re
+from typing import Dict, Optional
+
+from .cache import ArtifactCache
+from .serialization import dumps
+
+# 嵌入ID为配置内容哈希的前16位十六进制字符
+EMBED_ID_PATTERN = re.compile(r'^[0-9a-f]{16}$')
+
+
+class EmbedStore:
+    """
+    托管嵌入图表的配置存储
+
+    - 嵌入ID是按键排序后配置JSON的内容哈希，相同配置得到相同ID，内容不可变
+    - 配置以gzip压缩后的JSON保存，响应时直接输出压缩内容
+    - 指定disk_dir时持久化到磁盘且不淘汰，已发布的嵌入链接长期有效（persistent为True）；
+      内存层只是磁盘前的LRU缓存
+    - 未指定disk_dir时只保存在内存LRU中，超出容量或服务重启后嵌入链接失效
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024, disk_dir: str = None):
+        self._cache = ArtifactCache(
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            disk_dir=disk_dir,
+            max_disk_bytes=None
+        )
+        self.stored = 0
+
+    @property
+    def persistent(self) -> bool:
+        """已发布的嵌入是否永久保存"""
+        return self._cache.disk_dir is not None
+
+    def add(self, config: Dict) -> str:
+        """保存图表配置，返回嵌入ID"""
+        payload = dumps(config, sort_keys=True)
+        embed_id = hashlib.sha256(payload).hexdigest()[:16]
+        if self._cache.get(embed_id) is None:
+            self._cache.set(embed_id, gzip.compress(payload, compresslevel=6), 'application/json')
+            self.stored += 1
+        return embed_id
+
+    def get_compressed(self, embed_id: str) -> Optional[bytes]:
+        """获取gzip压缩的配置JSON，不存在时返回None"""
+        # ID会作为磁盘文件名，先校验格式
+        if not EMBED_ID_PATTERN.match(embed_id):
+            return None
+        item = self._cache.get(embed_id)
+        return item[0] if item is not None else None
+
+    def stats(self) -> Dict:
+        return {**self._cache.stats(), "stored": self.stored}
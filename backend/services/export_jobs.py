@@ -0,0 +1,239 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 任务处理函数返回(文件路径, MIME类型, 下载文件名)
+ExportHandler = Callable[["ExportJob"], Awaitable[Tuple[str, str, str]]]
+
+
+class ExportJob:
+    """后台导出任务，记录状态和导出文件，并向订阅者推送事件"""
+
+    def __init__(self, key: str, kind: str, format_type: str, payload: Dict):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.kind = kind
+        self.format = format_type
+        self.payload: Optional[Dict] = payload
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.path: Optional[str] = None
+        self.mime_type: Optional[str] = None
+        self.filename: Optional[str] = None
+        self.size: Optional[int] = None
+        self.created_at = datetime.now()
+        self.updated_at = self.created_at
+        self.finished_at: Optional[float] = None
+
+        # 事件日志，迟到的订阅者会先收到历史事件
+        self._events: List[Tuple[str, Any]] = []
+        self._condition = asyncio.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    async def publish(self, event: str, data: Any):
+        """记录事件并唤醒所有订阅者"""
+        async with self._condition:
+            self._events.append((event, data))
+            self.updated_at = datetime.now()
+            self._condition.notify_all()
+
+    async def start(self):
+        """标记任务开始执行"""
+        self.status = "running"
+        await self.publish("status", self.to_dict())
+
+    async def complete(self, path: str, mime_type: str, filename: str):
+        """标记任务完成并记录导出文件"""
+        self.path = path
+        self.mime_type = mime_type
+        self.filename = filename
+        self.size = os.path.getsize(path)
+        self.status = "completed"
+        self.finished_at = time.time()
+        self.payload = None
+        await self.publish("done", self.to_dict())
+
+    async def fail(self, error: str):
+        """标记任务失败"""
+        self.status = "failed"
+        self.error = error
+        self.finished_at = time.time()
+        self.payload = None
+        await self.publish("error", self.to_dict())
+
+    async def events(self) -> AsyncIterator[Tuple[str, Any]]:
+        """订阅任务事件，直到任务结束"""
+        index = 0
+        while True:
+            async with self._condition:
+                await self._condition.wait_for(lambda: index < len(self._events))
+                pending = self._events[index:]
+
+            for event in pending:
+                yield event
+            index += len(pending)
+
+            if pending and pending[-1][0] in ("done", "error"):
+                return
+
+    def remove_file(self):
+        """删除导出文件"""
+        if self.path and os.path.exists(self.path):
+            try:
+                os.remove(self.path)
+            except OSError as e:
+                logger.warning(f"删除导出文件失败: {str(e)}")
+        self.path = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "type": self.kind,
+            "format": self.format,
+            "status": self.status,
+            "error": self.error,
+            "size": self.size,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat()
+        }
+
+
+class ExportJobQueue:
+    """
+    进程内导出任务队列
+
+    - 固定数量的工作协程按提交顺序执行任务，导出请求不再占用请求处理时间
+    - 相同内容的任务（键相同）在排队、执行中或完成后未过期期间复用同一个任务
+    - 完成或失败的任务在ttl_seconds后过期，导出文件随之删除
+    """
+
+    def __init__(self, handler: ExportHandler, workers: int = 2, ttl_seconds: float = 3600,
+                 max_jobs: int = 256):
+        self.handler = handler
+        self.workers = workers
+        self.ttl_seconds = ttl_seconds
+        self.max_jobs = max_jobs
+
+        self._jobs: "OrderedDict[str, ExportJob]" = OrderedDict()
+        self._by_key: Dict[str, str] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+
+        self.submitted = 0
+        self.deduplicated = 0
+        self.expired = 0
+
+    def submit(self, key: str, kind: str, format_type: str, payload: Dict) -> ExportJob:
+        """
+        提交导出任务
+
+        Args:
+            key: 任务内容的哈希，用于去重
+            kind: 任务类型（chart、report）
+            format_type: 导出格式
+            payload: 导出请求体
+
+        Returns:
+            新建的任务或已存在的相同任务
+        """
+        self._expire()
+
+        existing = self._jobs.get(self._by_key.get(key))
+        if existing is not None and existing.status != "failed":
+            self.deduplicated += 1
+            return existing
+
+        active = sum(1 for job in self._jobs.values() if not job.finished)
+        if active >= self.max_jobs:
+            raise OverflowError(f"导出任务过多（{self.max_jobs}），请稍后再试")
+
+        self._ensure_workers()
+        job = ExportJob(key, kind, format_type, payload)
+        self._jobs[job.id] = job
+        self._by_key[key] = job.id
+        self._queue.put_nowait(job)
+        self.submitted += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        """获取任务，不存在或已过期时返回None"""
+        self._expire()
+        return self._jobs.get(job_id)
+
+    def _ensure_workers(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._worker_tasks = [task for task in self._worker_tasks if not task.done()]
+        while len(self._worker_tasks) < self.workers:
+            self._worker_tasks.append(asyncio.create_task(self._worker()))
+
+    async def _worker(self):
+        while True:
+            try:
+                job = await asyncio.wait_for(self._queue.get(), timeout=60)
+            except asyncio.TimeoutError:
+                # 空闲时清理过期任务
+                self._expire()
+                continue
+
+            try:
+                await job.start()
+                path, mime_type, filename = await self.handler(job)
+                await job.complete(path, mime_type, filename)
+            except asyncio.CancelledError:
+                await job.fail("导出任务已取消")
+                raise
+            except Exception as e:
+                # HTTPException的错误信息在detail中
+                error = getattr(e, "detail", None) or str(e)
+                logger.error(f"导出任务失败（{job.id}）: {error}")
+                await job.fail(error)
+            finally:
+                self._queue.task_done()
+
+    def _expire(self):
+        """移除过期任务并删除其导出文件"""
+        now = time.time()
+        expired_ids = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and now - job.finished_at > self.ttl_seconds
+        ]
+        for job_id in expired_ids:
+            job = self._jobs.pop(job_id)
+            job.remove_file()
+            if self._by_key.get(job.key) == job_id:
+                del self._by_key[job.key]
+            self.expired += 1
+
+    def shutdown(self):
+        """停止工作协程并删除全部导出文件"""
+        for task in self._worker_tasks:
+            task.cancel()
+        self._worker_tasks = []
+        for job in self._jobs.values():
+            job.remove_file()
+
+    def stats(self) -> Dict:
+        """队列统计信息"""
+        statuses: Dict[str, int] = {}
+        for job in self._jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "jobs": statuses,
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "expired": self.expired,
+            "ttl_seconds": self.ttl_seconds
+        }
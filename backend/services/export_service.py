@@ -1,19 +1,37 @@
 import logging
 import base64
-import json
-from typing import Tuple, Dict, Any
+import os
+import tempfile
+from collections import deque
+from datetime import datetime
+from typing import Tuple, Dict, Any, Iterator, List, Optional
 from io import BytesIO
 import asyncio
 
+from .svg_renderer import SVGRenderer
+from .render_pool import RenderPool
+from .serialization import dumps
+
 logger = logging.getLogger(__name__)
 
+# 报告导出支持的格式及MIME类型
+REPORT_FORMATS = {
+    'pdf': 'application/pdf',
+    'pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation'
+}
+
+class ExportDependencyError(Exception):
+    """导出所需的可选依赖未安装"""
+
 class ExportService:
     """导出服务"""
     
-    def __init__(self):
+    def __init__(self, render_pool: RenderPool = None):
         self.supported_formats = ['png', 'svg', 'pdf', 'markdown', 'iframe', 'pptx']
+        self.svg_renderer = SVGRenderer()
+        self.render_pool = render_pool or RenderPool()
     
-    async def export_text(self, chart_config: Dict, format_type: str, options: Any) -> str:
+    async def export_text(self, chart_config: Dict, format_type: str, options: Any, embed_url: str = None) -> str:
         """
         导出文本格式（markdown、iframe）
         
@@ -21,6 +39,7 @@ class ExportService:
             chart_config: 图表配置
             format_type: 导出格式
             options: 导出选项
+            embed_url: 托管嵌入页面地址（仅iframe）
             
         Returns:
             文本内容
@@ -29,7 +48,7 @@ class ExportService:
             if format_type == 'markdown':
                 return await self._export_markdown(chart_config, options)
             elif format_type == 'iframe':
-                return await self._export_iframe(chart_config, options)
+                return await self._export_iframe(chart_config, options, embed_url)
             else:
                 raise ValueError(f"不支持的文本格式: {format_type}")
                 
@@ -69,7 +88,10 @@ class ExportService:
         """导出Markdown格式"""
         # 简化实现：生成包含配置的Markdown
         title = chart_config.get('title', {}).get('text', '图表')
-        config_json = json.dumps(chart_config, ensure_ascii=False, indent=2)
+        # 配置中可能含有pandas时间戳、numpy数值等，统一使用serialization序列化
+        config_json = dumps(chart_config, indent=True).decode('utf-8')
+        # options为ExportOptions模型，未指定生成时间时取当前时间
+        timestamp = getattr(options, 'timestamp', None) or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
         markdown_content = f"""# {title}
 
@@ -83,24 +105,51 @@ class ExportService:
 
 此图表使用 ECharts 生成，可以直接在支持 ECharts 的环境中使用上述配置。
 
-生成时间: {options.get('timestamp', '未知')}
+生成时间: {timestamp}
 图表类型: {chart_config.get('series', [{}])[0].get('type', '未知')}
 """
         
         return markdown_content
     
-    async def _export_iframe(self, chart_config: Dict, options: Any) -> str:
-        """导出iframe嵌入代码"""
+    async def _export_iframe(self, chart_config: Dict, options: Any, embed_url: str = None) -> str:
+        """
+        导出iframe嵌入代码
+        
+        指定embed_url时引用托管的嵌入页面，否则将配置内联到data URI中
+        """
         width = getattr(options, 'width', 800)
         height = getattr(options, 'height', 600)
         
-        config_json = json.dumps(chart_config, ensure_ascii=False)
+        if embed_url:
+            src = embed_url
+        else:
+            config_json = dumps(chart_config).decode('utf-8')
+            iframe_html = self._embed_html(f"myChart.setOption({config_json});")
+            src = "data:text/html;charset=utf-8," + iframe_html.replace('"', '&quot;')
+        
+        iframe_code = f"""<iframe 
+    src="{src}"
+    width="{width}" 
+    height="{height}" 
+    frameborder="0">
+</iframe>"""
         
-        iframe_html = f"""<!DOCTYPE html>
+        return iframe_code
+    
+    def embed_page(self, config_url: str) -> str:
+        """托管嵌入页面，加载时从config_url获取图表配置"""
+        return self._embed_html(
+            f"fetch('{config_url}').then(function(r) {{ return r.json(); }})"
+            ".then(function(option) { myChart.setOption(option); });"
+        )
+    
+    def _embed_html(self, set_option_script: str) -> str:
+        return f"""<!DOCTYPE html>
 <html>
 <head>
     <meta charset="utf-8">
     <title>ECharts 图表</title>
+    <style>html, body {{ margin: 0; height: 100%; }}</style>
     <script src="https://cdn.jsdelivr.net/npm/echarts@5.4.3/dist/echarts.min.js"></script>
 </head>
 <body>
@@ -108,8 +157,7 @@ class ExportService:
     <script>
         var chartDom = document.getElementById('chart');
         var myChart = echarts.init(chartDom);
-        var option = {config_json};
-        myChart.setOption(option);
+        {set_option_script}
         
         // 响应式调整
         window.addEventListener('resize', function() {{
@@ -118,27 +166,18 @@ class ExportService:
     </script>
 </body>
 </html>"""
-        
-        iframe_code = f"""<iframe 
-    src="data:text/html;charset=utf-8,{iframe_html.replace('"', '&quot;')}"
-    width="{width}" 
-    height="{height}" 
-    frameborder="0">
-</iframe>"""
-        
-        return iframe_code
     
     async def _export_png(self, chart_config: Dict, options: Any) -> Tuple[bytes, str]:
-        """导出PNG格式"""
-        # 这里使用简化实现，实际应该使用headless浏览器或服务端渲染
-        # 由于没有安装相关依赖，返回模拟的PNG数据
-        
+        """导出PNG格式（在光栅化进程池中渲染）"""
         width = getattr(options, 'width', 800)
         height = getattr(options, 'height', 600)
         dpi = getattr(options, 'dpi', 300)
         
-        # 创建一个简单的PNG头部（实际应该渲染真实图表）
-        png_data = self._create_placeholder_image(width, height, 'PNG图表')
+        if not self.render_pool.available:
+            # 未安装cairosvg时返回占位图片
+            return self._create_placeholder_image(width, height, 'PNG图表'), 'image/png'
+        
+        png_data = await self.render_pool.render_png(chart_config, width=width, height=height, dpi=dpi)
         
         return png_data, 'image/png'
     
@@ -146,21 +185,17 @@ class ExportService:
         """导出SVG格式"""
         width = getattr(options, 'width', 800)
         height = getattr(options, 'height', 600)
-        title = chart_config.get('title', {}).get('text', '图表')
         
-        # 生成简单的SVG（实际应该渲染ECharts SVG）
-        svg_content = f"""<?xml version="1.0" encoding="UTF-8"?>
-<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">
-    <rect width="100%" height="100%" fill="#f8f9fa"/>
-    <text x="50%" y="50%" text-anchor="middle" font-family="Arial" font-size="24" fill="#333">
-        {title or 'ECharts 图表'}
-    </text>
-    <text x="50%" y="60%" text-anchor="middle" font-family="Arial" font-size="12" fill="#666">
-        图表类型: {chart_config.get('series', [{}])[0].get('type', '未知')}
-    </text>
-</svg>"""
+        loop = asyncio.get_running_loop()
+        svg_content = await loop.run_in_executor(None, self.svg_renderer.render, chart_config, width, height)
         
-        return svg_content.encode('utf-8'), 'image/svg+xml'
+        return svg_content, 'image/svg+xml'
+    
+    def stream_svg(self, chart_config: Dict, options: Any) -> Iterator[bytes]:
+        """逐段生成SVG内容，用于流式响应"""
+        width = getattr(options, 'width', 800)
+        height = getattr(options, 'height', 600)
+        return self.svg_renderer.iter_svg(chart_config, width, height)
     
     async def _export_pdf(self, chart_config: Dict, options: Any) -> Tuple[bytes, str]:
         """导出PDF格式"""
@@ -201,7 +236,6 @@ class ExportService:
         # 简化实现，实际应该使用python-pptx
         try:
             from pptx import Presentation
-            from pptx.util import Inches
             
             prs = Presentation()
             slide_layout = prs.slide_layouts[1]  # 标题和内容布局
@@ -235,6 +269,75 @@ class ExportService:
             
             return simple_pptx.encode('utf-8'), 'application/vnd.openxmlformats-officedocument.presentationml.presentation'
     
+    async def export_report(self, chart_configs: List[Dict], format_type: str, options: Any) -> str:
+        """
+        将多个图表导出为一个PDF或PPTX报告
+        
+        图表在光栅化进程池中并行渲染，按顺序逐页交给报告写入器；同时在途（已提交渲染、尚未写入）
+        的图片数量不超过进程池工作进程数的两倍。已写入的页面由reportlab/python-pptx保存在内存中，
+        直到close时才写出到临时文件，因此报告本身的内存占用仍随图表数量增长。
+        
+        Args:
+            chart_configs: 图表配置列表，每个图表一页
+            format_type: 报告格式（pdf、pptx）
+            options: 导出选项（width、height、dpi）
+            
+        Returns:
+            临时文件路径，由调用方负责删除
+        """
+        if format_type not in REPORT_FORMATS:
+            raise ValueError(f"不支持的报告格式: {format_type}，支持: {', '.join(REPORT_FORMATS)}")
+        
+        width = getattr(options, 'width', 800)
+        height = getattr(options, 'height', 600)
+        dpi = getattr(options, 'dpi', 300)
+        
+        fd, path = tempfile.mkstemp(suffix=f'.{format_type}')
+        os.close(fd)
+        
+        loop = asyncio.get_running_loop()
+        pending = deque()
+        try:
+            writer = await loop.run_in_executor(None, self._create_report_writer, format_type, path, width, height)
+            
+            async def write_next():
+                config, task = pending.popleft()
+                png_data = await task
+                await loop.run_in_executor(None, writer.add_chart, config, png_data)
+            
+            window = max(1, self.render_pool.max_workers * 2)
+            for config in chart_configs:
+                pending.append((config, asyncio.ensure_future(self._render_report_image(config, width, height, dpi))))
+                if len(pending) >= window:
+                    await write_next()
+            while pending:
+                await write_next()
+            
+            await loop.run_in_executor(None, writer.close)
+            return path
+            
+        except BaseException:
+            for _, task in pending:
+                task.cancel()
+            if os.path.exists(path):
+                os.remove(path)
+            raise
+    
+    async def _render_report_image(self, chart_config: Dict, width: int, height: int, dpi: int) -> Optional[bytes]:
+        """渲染报告中的单个图表，光栅化不可用时返回None"""
+        if not self.render_pool.available:
+            return None
+        return await self.render_pool.render_png(chart_config, width=width, height=height, dpi=dpi)
+    
+    def _create_report_writer(self, format_type: str, path: str, width: int, height: int):
+        try:
+            if format_type == 'pdf':
+                return _PDFReportWriter(path, width, height)
+            return _PPTXReportWriter(path, width, height)
+        except ImportError as e:
+            package = 'reportlab' if format_type == 'pdf' else 'python-pptx'
+            raise ExportDependencyError(f"导出{format_type.upper()}报告需要安装{package}") from e
+    
     def _create_placeholder_image(self, width: int, height: int, text: str) -> bytes:
         """创建占位图片"""
         # 简化实现：返回PNG文件头和基本数据
@@ -246,4 +349,93 @@ class ExportService:
         # 创建最小的PNG数据结构（这只是示例，不是完整的PNG）
         png_data = png_header + placeholder_text
         
-        return png_data
\ No newline at end of file
+        return png_data
+
+
+def _chart_title(chart_config: Dict, default: str) -> str:
+    title = chart_config.get('title') if isinstance(chart_config.get('title'), dict) else {}
+    return title.get('text') or default
+
+
+class _PDFReportWriter:
+    """逐页生成PDF报告（reportlab），每个图表一页，close时写出文件"""
+    
+    def __init__(self, path: str, width: int, height: int):
+        from reportlab.lib.pagesizes import A4, landscape
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+        from reportlab.pdfgen import canvas
+        
+        # 内置CID字体，支持中文标题
+        pdfmetrics.registerFont(UnicodeCIDFont('STSong-Light'))
+        self.font = 'STSong-Light'
+        self.page_size = landscape(A4) if width >= height else A4
+        self.canvas = canvas.Canvas(path, pagesize=self.page_size)
+        self.pages = 0
+    
+    def add_chart(self, chart_config: Dict, png_data: Optional[bytes]):
+        from reportlab.lib.utils import ImageReader
+        
+        page_width, page_height = self.page_size
+        margin = 36
+        self.pages += 1
+        self.canvas.setFont(self.font, 16)
+        self.canvas.drawCentredString(page_width / 2, page_height - margin - 8, _chart_title(chart_config, f'图表{self.pages}'))
+        
+        if png_data:
+            image = ImageReader(BytesIO(png_data))
+            image_width, image_height = image.getSize()
+            box_width = page_width - 2 * margin
+            box_height = page_height - 2 * margin - 40
+            scale = min(box_width / image_width, box_height / image_height)
+            draw_width, draw_height = image_width * scale, image_height * scale
+            self.canvas.drawImage(
+                image,
+                (page_width - draw_width) / 2,
+                margin + (box_height - draw_height) / 2,
+                width=draw_width,
+                height=draw_height
+            )
+        else:
+            self.canvas.setFont(self.font, 12)
+            self.canvas.drawCentredString(page_width / 2, page_height / 2, '图表图像需要安装cairosvg后生成')
+        
+        self.canvas.showPage()
+    
+    def close(self):
+        self.canvas.save()
+
+
+class _PPTXReportWriter:
+    """逐页生成PPTX报告（python-pptx），每个图表一张幻灯片，close时写出文件"""
+    
+    def __init__(self, path: str, width: int, height: int):
+        from pptx import Presentation
+        
+        self.path = path
+        self.presentation = Presentation()
+        self.slides = 0
+    
+    def add_chart(self, chart_config: Dict, png_data: Optional[bytes]):
+        from pptx.util import Inches, Pt
+        
+        self.slides += 1
+        slide = self.presentation.slides.add_slide(self.presentation.slide_layouts[5])  # 仅标题布局
+        slide.shapes.title.text = _chart_title(chart_config, f'图表{self.slides}')
+        
+        slide_width = self.presentation.slide_width
+        slide_height = self.presentation.slide_height
+        top = Inches(1.5)
+        if png_data:
+            picture = slide.shapes.add_picture(BytesIO(png_data), 0, top)
+            scale = min((slide_width - Inches(1)) / picture.width, (slide_height - top - Inches(0.5)) / picture.height)
+            picture.width = int(picture.width * scale)
+            picture.height = int(picture.height * scale)
+            picture.left = int((slide_width - picture.width) / 2)
+        else:
+            box = slide.shapes.add_textbox(Inches(1), top, slide_width - Inches(2), Inches(1))
+            box.text_frame.text = '图表图像需要安装cairosvg后生成'
+            box.text_frame.paragraphs[0].runs[0].font.size = Pt(16)
+    
+    def close(self):
+        self.presentation.save(self.path)
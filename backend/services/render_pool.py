@@ -0,0 +1,254 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 输出PNG单边像素上限，避免过大的DPI撑爆内存
+MAX_PNG_SIDE = 8000
+
+
+class RenderQueueFullError(Exception):
+    """渲染队列已满"""
+
+
+class RenderTimeoutError(Exception):
+    """渲染任务超时"""
+
+
+def rasterizer_available() -> bool:
+    """检查PNG光栅化依赖（cairosvg及系统cairo库）是否可用"""
+    try:
+        import cairosvg  # noqa: F401
+        return True
+    except (ImportError, OSError):
+        # cairosvg已安装但缺少libcairo时抛出OSError
+        return False
+
+
+def _init_worker():
+    """工作进程初始化：预先导入渲染依赖，避免首个任务承担导入开销"""
+    import cairosvg  # noqa: F401
+    from .svg_renderer import SVGRenderer  # noqa: F401
+
+
+def _ping() -> bool:
+    return True
+
+
+def _rasterize(job: Dict) -> bytes:
+    """在工作进程中将图表配置或SVG光栅化为PNG"""
+    import cairosvg
+    from .svg_renderer import SVGRenderer
+
+    width = int(job.get('width') or 800)
+    height = int(job.get('height') or 600)
+    svg = job.get('svg')
+    if svg is None:
+        svg = SVGRenderer().render(job['config'], width, height)
+
+    # 以96 DPI为基准缩放
+    scale = max(float(job.get('dpi') or 96), 1.0) / 96
+    scale = min(scale, MAX_PNG_SIDE / max(width, height, 1))
+    return cairosvg.svg2png(
+        bytestring=svg,
+        output_width=max(1, round(width * scale)),
+        output_height=max(1, round(height * scale))
+    )
+
+
+class RenderPool:
+    """
+    PNG光栅化进程池
+
+    - 工作进程常驻并预热，任务不在事件循环中执行
+    - 排队任务数超过max_queue时拒绝新任务
+    - 单个任务超时后重建进程池（卡住的进程被终止），同一进程池中被波及的其他任务在新进程池中重试一次，
+      重试不延长任务的总超时时间
+    - 每个工作进程平均处理max_jobs_per_worker个任务后整体轮换进程池，限制内存增长
+    """
+
+    def __init__(self, max_workers: int = 2, max_jobs_per_worker: int = 100, job_timeout: float = 30.0,
+                 max_queue: int = 64):
+        self.max_workers = max_workers
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.job_timeout = job_timeout
+        self.max_queue = max_queue
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_jobs = 0
+        self._lock = threading.Lock()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._available: Optional[bool] = None
+
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.recycles = 0
+        self.retries = 0
+        self.total_render_seconds = 0.0
+        self._recent = deque(maxlen=1000)
+
+    @property
+    def available(self) -> bool:
+        """PNG光栅化是否可用"""
+        if self._available is None:
+            self._available = rasterizer_available()
+            if not self._available:
+                logger.warning("cairosvg或cairo库不可用，PNG导出将使用占位图片")
+        return self._available
+
+    async def render_png(self, config: Dict = None, svg: bytes = None, width: int = 800, height: int = 600,
+                         dpi: int = 96) -> bytes:
+        """
+        渲染PNG
+
+        Args:
+            config: ECharts配置（与svg二选一）
+            svg: 已渲染的SVG内容
+            width: 逻辑宽度（96 DPI下的像素）
+            height: 逻辑高度
+            dpi: 输出DPI
+
+        Returns:
+            PNG字节
+        """
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise RenderQueueFullError(f"渲染队列已满（{self.max_queue}）")
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+
+        job = {'config': config, 'svg': svg, 'width': width, 'height': height, 'dpi': dpi}
+        self.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+
+        self.running += 1
+        started = time.perf_counter()
+        try:
+            result = await self._submit(job)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self.failed += 1
+            raise RenderTimeoutError(f"PNG渲染超时（{self.job_timeout}s）")
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.running -= 1
+            self._slots.release()
+
+        elapsed = time.perf_counter() - started
+        self.completed += 1
+        self.total_render_seconds += elapsed
+        self._recent.append(time.time())
+        return result
+
+    async def _submit(self, job: Dict, deadline: float = None) -> bytes:
+        """
+        提交任务并等待结果；进程池因其他任务超时或进程崩溃而失效时，在新进程池中重试一次
+
+        超时从首次提交开始计算，重试只使用剩余时间
+        """
+        loop = asyncio.get_running_loop()
+        retry = deadline is None
+        if retry:
+            deadline = loop.time() + self.job_timeout
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            raise asyncio.TimeoutError()
+
+        executor = self._get_executor()
+        try:
+            future = executor.submit(_rasterize, job)
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=remaining)
+        except asyncio.TimeoutError:
+            logger.error(f"PNG渲染超时（{self.job_timeout}s），重建渲染进程池")
+            self._restart(executor, kill=True)
+            raise
+        except (BrokenProcessPool, RuntimeError) as e:
+            # BrokenProcessPool是RuntimeError的子类；其他RuntimeError仅处理进程池在提交前已被关闭的情况
+            if not isinstance(e, BrokenProcessPool) and 'shutdown' not in str(e):
+                raise
+            self._restart(executor)
+            if not retry:
+                raise
+            self.retries += 1
+            logger.warning("渲染进程池已失效，任务在新进程池中重试")
+            return await self._submit(job, deadline=deadline)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """获取当前进程池，达到任务数上限时轮换"""
+        with self._lock:
+            if self._executor is not None and self._executor_jobs >= self.max_jobs_per_worker * self.max_workers:
+                old = self._executor
+                self._executor = None
+                self.recycles += 1
+                # 已提交的任务继续在旧进程池中完成
+                old.shutdown(wait=False)
+
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker
+                )
+                self._executor_jobs = 0
+                # 预先启动全部工作进程
+                for _ in range(self.max_workers):
+                    self._executor.submit(_ping)
+
+            self._executor_jobs += 1
+            return self._executor
+
+    def _restart(self, executor: ProcessPoolExecutor, kill: bool = False):
+        """丢弃进程池，kill为True时终止其中的进程"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+                self.recycles += 1
+
+        if kill:
+            # ProcessPoolExecutor没有公开终止进程的接口
+            for process in list((getattr(executor, '_processes', None) or {}).values()):
+                process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        """关闭进程池"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict:
+        """渲染统计信息"""
+        now = time.time()
+        last_minute = sum(1 for finished in self._recent if now - finished <= 60)
+        return {
+            "available": self.available,
+            "workers": self.max_workers,
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "recycles": self.recycles,
+            "retries": self.retries,
+            "avg_render_ms": round(self.total_render_seconds / self.completed * 1000, 1) if self.completed else None,
+            "jobs_last_minute": last_minute
+        }
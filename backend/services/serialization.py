@@ -0,0 +1,85 @@
+import json
+import math
+from datetime import date, datetime, time, timedelta
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson不可用时退化为标准库json
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """处理orjson/json无法直接序列化的类型（pandas时间类型、numpy标量等）"""
+    if obj is pd.NaT:
+        return None
+    if isinstance(obj, (pd.Timestamp, datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, (pd.Timedelta, timedelta)):
+        return str(obj)
+    if isinstance(obj, np.generic):
+        return _sanitize(obj.item())
+    if isinstance(obj, np.ndarray):
+        return _sanitize(obj.tolist())
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+
+def _sanitize(obj: Any) -> Any:
+    """将NaN/Inf替换为None（仅标准库json回退路径使用）"""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _sanitize(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_sanitize(value) for value in obj]
+    return obj
+
+
+def dumps(obj: Any, sort_keys: bool = False, indent: bool = False) -> bytes:
+    """
+    序列化为UTF-8 JSON字节
+
+    原生支持numpy数组/标量和日期时间，NaN、Inf和NaT输出为null，保证结果是合法JSON。
+    sort_keys为True时按键排序，用于计算内容哈希；indent为True时以两个空格缩进，用于可读的导出内容。
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+
+    return json.dumps(
+        _sanitize(obj),
+        default=_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        sort_keys=sort_keys,
+        indent=2 if indent else None,
+        separators=(',', ': ') if indent else (',', ':')
+    ).encode('utf-8')
+
+
+def loads(data: Any) -> Any:
+    """解析JSON字节或字符串"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    基于orjson的JSON响应
+
+    需直接返回该响应对象（而不是仅声明response_class），以跳过FastAPI逐个单元格的jsonable_encoder
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,95 @@
+from typing import Dict, Union
+
+import numpy as np
+
+# 支持的直方图分箱规则
+HISTOGRAM_BIN_RULES = ['fd', 'sturges']
+
+
+def box_plot_stats(values: np.ndarray, whisker: float = 1.5, max_outliers: int = 1000) -> Dict:
+    """
+    计算箱线图统计量
+
+    Args:
+        values: 数值数组，NaN会被忽略
+        whisker: 须线长度系数（IQR的倍数）
+        max_outliers: 返回的异常值数量上限，超出时按排序后等距抽取
+
+    Returns:
+        包含low、q1、median、q3、high、outliers和count的字典，无有效值时返回None
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return None
+
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    lower_fence = q1 - whisker * iqr
+    upper_fence = q3 + whisker * iqr
+
+    # 须线延伸到围栏内的最远数据点
+    inside = values[(values >= lower_fence) & (values <= upper_fence)]
+    low = inside.min() if len(inside) else q1
+    high = inside.max() if len(inside) else q3
+
+    outliers = np.sort(values[(values < lower_fence) | (values > upper_fence)])
+    if len(outliers) > max_outliers:
+        outliers = outliers[np.linspace(0, len(outliers) - 1, max_outliers).astype(int)]
+
+    return {
+        'low': float(low),
+        'q1': float(q1),
+        'median': float(median),
+        'q3': float(q3),
+        'high': float(high),
+        'outliers': outliers.tolist(),
+        'count': int(len(values))
+    }
+
+
+def histogram(values: np.ndarray, bins: Union[str, int] = 'fd', max_bins: int = 200):
+    """
+    计算直方图分箱
+
+    Args:
+        values: 数值数组，NaN会被忽略
+        bins: 分箱规则（fd为Freedman–Diaconis，sturges为Sturges）或分箱数量
+        max_bins: 分箱数量上限，避免长尾数据产生过多分箱
+
+    Returns:
+        (分箱边界数组, 各分箱计数数组)
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return np.array([]), np.array([], dtype=int)
+
+    if isinstance(bins, str):
+        if bins not in HISTOGRAM_BIN_RULES:
+            raise ValueError(f"不支持的分箱规则: {bins}，支持: {', '.join(HISTOGRAM_BIN_RULES)}")
+        count = _rule_bin_count(values, bins)
+    else:
+        count = int(bins)
+
+    # 先限制分箱数量再生成边界，极端离群值不会产生海量分箱
+    edges = np.histogram_bin_edges(values, bins=max(1, min(count, max_bins)))
+
+    counts, edges = np.histogram(values, bins=edges)
+    return edges, counts
+
+
+def _rule_bin_count(values: np.ndarray, rule: str) -> int:
+    """按分箱规则计算分箱数量（不生成边界）"""
+    sturges = int(np.ceil(np.log2(len(values)))) + 1
+    if rule == 'sturges':
+        return sturges
+
+    # Freedman–Diaconis：分箱宽度为2·IQR/n^(1/3)，IQR为0时退化为Sturges
+    q1, q3 = np.percentile(values, [25, 75])
+    width = 2 * (q3 - q1) / np.cbrt(len(values))
+    value_range = values.max() - values.min()
+    if width <= 0 or value_range <= 0:
+        return sturges
+    count = value_range / width
+    return int(np.ceil(count)) if np.isfinite(count) else sturges
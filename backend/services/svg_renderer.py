@@ -0,0 +1,819 @@
+import math
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+# 服务端可渲染的系列类型
+SVG_SERIES_TYPES = ['bar', 'line', 'scatter', 'heatmap', 'boxplot', 'pie', 'funnel']
+
+# 与ECharts默认值一致的样式
+_DEFAULT_COLORS = ['#5470c6', '#91cc75', '#fac858', '#ee6666', '#73c0de', '#3ba272', '#fc8452', '#9a60b4', '#ea7ccc']
+_VISUAL_MAP_COLORS = ['#f6efa6', '#d88273', '#bf444c']
+_FONT_FAMILY = 'sans-serif'
+_TEXT_COLOR = '#333'
+_AXIS_COLOR = '#6e7079'
+_GRID_COLOR = '#e0e6f1'
+
+# 每个路径片段包含的点数，大系列的路径按片段逐步输出
+_POINTS_PER_CHUNK = 2000
+
+
+class SVGRenderer:
+    """
+    将ChartGenerator生成的ECharts配置渲染为SVG（纯Python实现，无需浏览器）
+
+    支持柱状/条形图（含堆积）、折线/面积图（含堆积）、散点图、热力图、箱线图、饼图（含玫瑰图）和漏斗图，
+    同时支持dataset/encode形式的配置。SVG按元素逐段生成，大数据量时不会拼接整个字符串。
+    折线的平滑效果以直线段近似。
+    """
+
+    def __init__(self, chunk_size: int = 64 * 1024):
+        self.chunk_size = chunk_size
+
+    def render(self, config: Dict, width: int = 800, height: int = 600) -> bytes:
+        """渲染完整的SVG文档"""
+        return b''.join(self.iter_svg(config, width, height))
+
+    def iter_svg(self, config: Dict, width: int = 800, height: int = 600) -> Iterator[bytes]:
+        """
+        逐段生成SVG文档
+
+        Args:
+            config: ECharts配置
+            width: 画布宽度
+            height: 画布高度
+
+        Yields:
+            UTF-8编码的SVG片段，每段约chunk_size字节
+        """
+        buffer = []
+        size = 0
+        for part in self._iter_elements(config, int(width or 800), int(height or 600)):
+            buffer.append(part)
+            size += len(part)
+            if size >= self.chunk_size:
+                yield ''.join(buffer).encode('utf-8')
+                buffer = []
+                size = 0
+        if buffer:
+            yield ''.join(buffer).encode('utf-8')
+
+    def _iter_elements(self, config: Dict, width: int, height: int) -> Iterator[str]:
+        config = _expand_dataset(config)
+        series = [item for item in config.get('series') or [] if isinstance(item, dict)]
+        colors = config.get('color') or _DEFAULT_COLORS
+
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+        yield (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+               f'viewBox="0 0 {width} {height}" font-family="{_FONT_FAMILY}">\n')
+
+        background = config.get('backgroundColor')
+        yield f'<rect width="100%" height="100%" fill="{_attr(background if background not in (None, "transparent") else "#ffffff")}"/>\n'
+
+        top = 10
+        title = (config.get('title') or {}).get('text') if isinstance(config.get('title'), dict) else None
+        if title:
+            yield _text(width / 2, 28, title, size=16, weight='bold', anchor='middle') + '\n'
+            top = 44
+
+        types = {item.get('type') for item in series}
+        if types & {'pie', 'funnel'}:
+            kind = 'pie' if 'pie' in types else 'funnel'
+            items = next(item for item in series if item.get('type') == kind)
+            names = [_item_name(point, i) for i, point in enumerate(items.get('data') or [])]
+            legend_items = [(name, colors[i % len(colors)]) for i, name in enumerate(names)]
+        else:
+            legend_items = [
+                (str(item.get('name', '')), _series_color(item, i, colors))
+                for i, item in enumerate(series)
+                if item.get('name') is not None
+            ]
+
+        legend = config.get('legend') if isinstance(config.get('legend'), dict) else {}
+        if legend.get('data'):
+            allowed = {str(name) for name in legend['data']}
+            legend_items = [item for item in legend_items if item[0] in allowed]
+
+        bottom = height - 10
+        if legend.get('show', True) and legend_items and len(legend_items) <= 50:
+            rows = _layout_legend(legend_items, width - 40)
+            legend_height = len(rows) * 20
+            legend_top = bottom - legend_height if legend.get('top') == 'bottom' else top
+            yield from _render_legend(rows, width, legend_top)
+            if legend.get('top') == 'bottom':
+                bottom -= legend_height + 6
+            else:
+                top += legend_height + 6
+
+        area = (20, top + 10, width - 20, bottom)
+        if not series or not types & set(SVG_SERIES_TYPES):
+            yield _text(width / 2, height / 2, '该图表类型暂不支持服务端渲染', size=14, anchor='middle', color='#999') + '\n'
+        elif 'pie' in types:
+            yield from self._render_pie(next(item for item in series if item.get('type') == 'pie'), colors, area)
+        elif 'funnel' in types:
+            yield from self._render_funnel(next(item for item in series if item.get('type') == 'funnel'), colors, area)
+        else:
+            yield from self._render_cartesian(config, series, colors, area)
+
+        yield '</svg>\n'
+
+    # ---------- 直角坐标系 ----------
+
+    def _render_cartesian(self, config: Dict, series: List[Dict], colors: List[str], area: Tuple) -> Iterator[str]:
+        x_axis = _first_axis(config.get('xAxis'))
+        y_axes = config.get('yAxis') if isinstance(config.get('yAxis'), list) else [_first_axis(config.get('yAxis'))]
+        y_axes = [axis if isinstance(axis, dict) else {} for axis in y_axes] or [{}]
+
+        horizontal = y_axes[0].get('type') == 'category' and x_axis.get('type') != 'category'
+        categories = None
+        if x_axis.get('type') == 'category':
+            categories = list(x_axis.get('data') or [])
+        elif y_axes[0].get('type') == 'category':
+            categories = list(y_axes[0].get('data') or [])
+        heatmap = any(item.get('type') == 'heatmap' for item in series)
+        y_categories = list(y_axes[0].get('data') or []) if heatmap else None
+
+        # 计算各系列（含堆积）的数值
+        prepared = _prepare_series(series, len(categories) if categories is not None else 0)
+
+        # 数值轴范围
+        value_axes = []
+        if heatmap:
+            value_axes = []
+        elif categories is None:
+            x_values = [p['x'] for p in prepared if p['x'] is not None]
+            y_values = [p['upper'] for p in prepared]
+            value_axes = [_value_scale(x_axis, x_values), _value_scale(y_axes[0], y_values)]
+        else:
+            for index, axis in enumerate(y_axes if not horizontal else [x_axis]):
+                values = [p['upper'] for p in prepared if p['axis'] == index]
+                values += [p['lower'] for p in prepared if p['axis'] == index and p['lower'] is not None]
+                value_axes.append(_value_scale(axis, values))
+
+        # 根据刻度标签宽度确定绘图区
+        left, top, right, bottom = area
+        label_width = 0
+        if heatmap:
+            label_width = max((_text_width(_short(label), 12) for label in y_categories), default=0)
+        elif horizontal:
+            label_width = max((_text_width(_short(label), 12) for label in categories), default=0)
+        else:
+            label_width = max((_text_width(_format_number(tick), 12) for tick in value_axes[0][2]), default=0)
+        left += max(30, label_width + 12)
+        if not horizontal and len(value_axes) > 1 and categories is not None:
+            right -= max(30, max((_text_width(_format_number(tick), 12) for tick in value_axes[1][2]), default=0) + 12)
+        else:
+            right -= 10
+        top += 16 if any(axis.get('name') for axis in y_axes) else 0
+        bottom -= 28 + (18 if x_axis.get('name') else 0)
+        visual_map = config.get('visualMap') if heatmap and isinstance(config.get('visualMap'), dict) else None
+        if visual_map:
+            bottom -= 40
+        if right - left < 20 or bottom - top < 20:
+            return
+
+        plot = (left, top, right, bottom)
+        show_grid = (config.get('grid') or {}).get('show', True) if isinstance(config.get('grid'), dict) else True
+
+        # 类目轴位置
+        boundary_gap = x_axis.get('boundaryGap', True) if not horizontal else True
+        if categories is not None:
+            extent = (right - left) if not horizontal else (bottom - top)
+            count = max(len(categories), 1)
+            band = extent / count
+            if not boundary_gap and count > 1:
+                positions = left + np.arange(count) * (extent / (count - 1))
+            elif horizontal:
+                positions = bottom - (np.arange(count) + 0.5) * band
+            else:
+                positions = left + (np.arange(count) + 0.5) * band
+
+        # 网格线和坐标轴
+        yield '<g class="axes">\n'
+        if heatmap:
+            yield from _render_category_axis(categories, plot, 'x', x_axis)
+            yield from _render_category_axis(y_categories, plot, 'y', y_axes[0])
+        elif categories is None:
+            yield from _render_value_axis(value_axes[0], plot, 'x', show_grid, x_axis)
+            yield from _render_value_axis(value_axes[1], plot, 'y', show_grid, y_axes[0])
+        elif horizontal:
+            yield from _render_value_axis(value_axes[0], plot, 'x', show_grid, x_axis)
+            yield from _render_category_axis(categories, plot, 'y', y_axes[0])
+        else:
+            for index, scale in enumerate(value_axes):
+                yield from _render_value_axis(scale, plot, 'y' if index == 0 else 'y2', show_grid and index == 0, y_axes[index])
+            yield from _render_category_axis(categories, plot, 'x', x_axis, positions if not boundary_gap else None)
+        yield '</g>\n'
+
+        if heatmap:
+            yield from self._render_heatmap(series, categories, y_categories, plot, visual_map)
+            return
+
+        # 柱状系列按堆积分组并排排列
+        bar_groups = []
+        for p in prepared:
+            if p['type'] == 'bar' and p['group'] not in bar_groups:
+                bar_groups.append(p['group'])
+
+        for index, p in enumerate(prepared):
+            item = p['series']
+            color = _series_color(item, index, colors)
+            if color == 'transparent':
+                # 瀑布图等的透明辅助系列只参与堆积，不绘制
+                continue
+            if p['type'] == 'scatter' or categories is None:
+                yield from _render_scatter(p, value_axes, plot, color, categories is None, positions if categories is not None else None)
+            elif p['type'] == 'bar':
+                yield from _render_bars(p, value_axes[p['axis']], plot, positions, band, bar_groups, horizontal, color)
+            elif p['type'] == 'line':
+                yield from _render_line(p, value_axes[p['axis']], plot, positions, color)
+            elif p['type'] == 'boxplot':
+                yield from _render_boxplot(p, value_axes[p['axis']], plot, positions, band, color)
+
+    def _render_heatmap(self, series: List[Dict], x_categories: List, y_categories: List, plot: Tuple,
+                        visual_map: Optional[Dict]) -> Iterator[str]:
+        left, top, right, bottom = plot
+        cell_w = (right - left) / max(len(x_categories), 1)
+        cell_h = (bottom - top) / max(len(y_categories), 1)
+        item = next(item for item in series if item.get('type') == 'heatmap')
+        data = [point for point in item.get('data') or [] if isinstance(point, (list, tuple)) and len(point) >= 3]
+
+        values = np.array([_to_float(point[2]) for point in data], dtype=float)
+        finite = values[np.isfinite(values)]
+        vmin = (visual_map or {}).get('min', finite.min() if len(finite) else 0)
+        vmax = (visual_map or {}).get('max', finite.max() if len(finite) else 1)
+        show_label = (item.get('label') or {}).get('show', False) and cell_w >= 28 and cell_h >= 14
+
+        yield '<g class="series heatmap">\n'
+        for start in range(0, len(data), _POINTS_PER_CHUNK):
+            parts = []
+            for point, value in zip(data[start:start + _POINTS_PER_CHUNK], values[start:start + _POINTS_PER_CHUNK]):
+                if not np.isfinite(value):
+                    continue
+                x = left + int(point[0]) * cell_w
+                y = bottom - (int(point[1]) + 1) * cell_h
+                parts.append(f'<rect x="{x:.2f}" y="{y:.2f}" width="{cell_w:.2f}" height="{cell_h:.2f}" '
+                             f'fill="{_gradient_color(value, vmin, vmax)}"/>')
+                if show_label:
+                    parts.append(_text(x + cell_w / 2, y + cell_h / 2 + 4, _format_number(value), size=11, anchor='middle'))
+            yield '\n'.join(parts) + '\n'
+        yield '</g>\n'
+
+        if visual_map:
+            bar_w = min(200, right - left)
+            bar_x = (left + right) / 2 - bar_w / 2
+            bar_y = bottom + 40
+            stops = ''.join(
+                f'<stop offset="{i / (len(_VISUAL_MAP_COLORS) - 1):.2f}" stop-color="{color}"/>'
+                for i, color in enumerate(_VISUAL_MAP_COLORS)
+            )
+            yield f'<defs><linearGradient id="visualMap">{stops}</linearGradient></defs>\n'
+            yield f'<rect x="{bar_x:.2f}" y="{bar_y:.2f}" width="{bar_w:.2f}" height="12" fill="url(#visualMap)"/>\n'
+            yield _text(bar_x - 6, bar_y + 10, _format_number(vmin), size=11, anchor='end') + '\n'
+            yield _text(bar_x + bar_w + 6, bar_y + 10, _format_number(vmax), size=11, anchor='start') + '\n'
+
+    # ---------- 饼图和漏斗图 ----------
+
+    def _render_pie(self, item: Dict, colors: List[str], area: Tuple) -> Iterator[str]:
+        left, top, right, bottom = area
+        data = item.get('data') or []
+        values = np.array([max(_to_float(_item_value(point)), 0) for point in data], dtype=float)
+        values = np.nan_to_num(values)
+        total = values.sum()
+        if total <= 0:
+            return
+
+        cx = _percent((item.get('center') or ['50%', '50%'])[0], right - left) + left
+        cy = _percent((item.get('center') or ['50%', '50%'])[1], bottom - top) + top
+        size = min(right - left, bottom - top) / 2
+        radius = item.get('radius', '50%')
+        if isinstance(radius, (list, tuple)):
+            inner, outer = _percent(radius[0], size), _percent(radius[1], size)
+        else:
+            inner, outer = 0.0, _percent(radius, size)
+
+        rose = item.get('roseType')
+        if rose:
+            # 南丁格尔图：扇区角度相等，半径表示数值
+            angles = np.full(len(values), 2 * math.pi / len(values))
+            radii = inner + (outer - inner) * values / (values.max() or 1)
+        else:
+            angles = values / total * 2 * math.pi
+            radii = np.full(len(values), outer)
+
+        yield '<g class="series pie">\n'
+        start = -math.pi / 2
+        labels = []
+        for index, (point, angle, r) in enumerate(zip(data, angles, radii)):
+            if angle <= 0:
+                continue
+            end = start + angle
+            color = _item_color(point, colors[index % len(colors)])
+            yield f'<path d="{_sector_path(cx, cy, inner, r, start, end)}" fill="{_attr(color)}" stroke="#fff" stroke-width="1"/>\n'
+            if angle >= 0.05:
+                labels.append((_item_name(point, index), (start + end) / 2, r))
+            start = end
+
+        for name, mid, r in labels:
+            x1, y1 = cx + r * math.cos(mid), cy + r * math.sin(mid)
+            x2, y2 = cx + (r + 14) * math.cos(mid), cy + (r + 14) * math.sin(mid)
+            x3 = x2 + (12 if math.cos(mid) >= 0 else -12)
+            yield f'<polyline points="{x1:.2f},{y1:.2f} {x2:.2f},{y2:.2f} {x3:.2f},{y2:.2f}" fill="none" stroke="#999"/>\n'
+            yield _text(x3 + (3 if math.cos(mid) >= 0 else -3), y2 + 4, _short(name), size=12,
+                        anchor='start' if math.cos(mid) >= 0 else 'end') + '\n'
+        yield '</g>\n'
+
+    def _render_funnel(self, item: Dict, colors: List[str], area: Tuple) -> Iterator[str]:
+        left, top, right, bottom = area
+        data = [point for point in item.get('data') or [] if np.isfinite(_to_float(_item_value(point)))]
+        if not data:
+            return
+
+        area_w = right - left
+        x0 = left + _percent(item.get('left', '10%'), area_w)
+        width = _percent(item.get('width', '80%'), area_w)
+        y0 = top + min(_percent(item.get('top', 60), bottom - top), (bottom - top) / 4)
+        y1 = bottom - min(_percent(item.get('bottom', 60), bottom - top), (bottom - top) / 4)
+        values = np.array([max(_to_float(_item_value(point)), 0) for point in data], dtype=float)
+        max_value = values.max() or 1
+        widths = values / max_value * width
+        step = (y1 - y0) / len(data)
+        cx = x0 + width / 2
+
+        yield '<g class="series funnel">\n'
+        for index, point in enumerate(data):
+            top_w = widths[index]
+            bottom_w = widths[index + 1] if index + 1 < len(data) else 0
+            ya = y0 + index * step
+            yb = ya + step - 2
+            points = (f'{cx - top_w / 2:.2f},{ya:.2f} {cx + top_w / 2:.2f},{ya:.2f} '
+                      f'{cx + bottom_w / 2:.2f},{yb:.2f} {cx - bottom_w / 2:.2f},{yb:.2f}')
+            color = _item_color(point, colors[index % len(colors)])
+            yield f'<polygon points="{points}" fill="{_attr(color)}" stroke="#fff"/>\n'
+            yield _text(cx, (ya + yb) / 2 + 4, _short(_item_name(point, index)), size=12, anchor='middle', color='#fff') + '\n'
+        yield '</g>\n'
+
+
+# ---------- 配置预处理 ----------
+
+def _expand_dataset(config: Dict) -> Dict:
+    """将dataset/encode形式的配置还原为系列内联数据"""
+    dataset = config.get('dataset')
+    source = dataset.get('source') if isinstance(dataset, dict) else None
+    series = config.get('series')
+    if not isinstance(source, dict) or not isinstance(series, list):
+        return config
+
+    config = dict(config)
+    category_key = None
+    for axis_key, encode_key in (('xAxis', 'x'), ('yAxis', 'y')):
+        axis = config.get(axis_key)
+        if isinstance(axis, dict) and axis.get('type') == 'category' and axis.get('data') is None:
+            dimension = next(
+                (item['encode'][encode_key] for item in series
+                 if isinstance(item.get('encode'), dict) and encode_key in item['encode']),
+                None
+            )
+            if dimension in source:
+                config[axis_key] = {**axis, 'data': source[dimension]}
+                category_key = encode_key
+
+    value_key = 'x' if category_key == 'y' else 'y'
+    config['series'] = [
+        {**item, 'data': source.get(item['encode'].get(value_key), [])}
+        if isinstance(item.get('encode'), dict) and 'data' not in item else item
+        for item in series
+    ]
+    return config
+
+
+def _prepare_series(series: List[Dict], category_count: int) -> List[Dict]:
+    """计算各系列的数值数组，堆积系列在同组内按正负分别累加"""
+    stacks = {}
+    prepared = []
+    for index, item in enumerate(series):
+        series_type = item.get('type', 'bar')
+        axis = int(item.get('yAxisIndex', 0) or 0)
+        entry = {'series': item, 'type': series_type, 'axis': axis, 'x': None, 'lower': None,
+                 'group': item.get('stack') or f'__series{index}'}
+
+        data = item.get('data') or []
+        if series_type == 'boxplot':
+            boxes = np.array([
+                [_to_float(value) for value in box] if isinstance(box, (list, tuple)) and len(box) >= 5 else [np.nan] * 5
+                for box in data
+            ], dtype=float).reshape(-1, 5)
+            entry['boxes'] = boxes
+            entry['upper'] = boxes.ravel()
+            entry['lower'] = None
+        elif series_type == 'scatter' or (data and isinstance(_item_value(data[0]), (list, tuple))):
+            points = [point for point in data if isinstance(_item_value(point), (list, tuple)) and len(_item_value(point)) >= 2]
+            entry['x'] = np.array([_to_float(_item_value(point)[0]) for point in points], dtype=float)
+            entry['upper'] = np.array([_to_float(_item_value(point)[1]) for point in points], dtype=float)
+            # 泡泡图等逐点指定的大小
+            if any(isinstance(point, dict) and 'symbolSize' in point for point in points):
+                entry['sizes'] = np.array([
+                    _to_float(point.get('symbolSize')) if isinstance(point, dict) else np.nan for point in points
+                ], dtype=float)
+        else:
+            values = _to_float_array([_item_value(point) for point in data])
+            if category_count and len(values) < category_count:
+                values = np.concatenate([values, np.full(category_count - len(values), np.nan)])
+            if item.get('stack'):
+                key = (axis, item['stack'])
+                positive, negative = stacks.get(key, (np.zeros(len(values)), np.zeros(len(values))))
+                filled = np.nan_to_num(values)
+                base = np.where(filled >= 0, positive[:len(values)], negative[:len(values)])
+                entry['lower'] = base
+                entry['upper'] = base + filled
+                stacks[key] = (positive[:len(values)] + np.where(filled >= 0, filled, 0),
+                               negative[:len(values)] + np.where(filled < 0, filled, 0))
+            else:
+                entry['upper'] = values
+                if series_type == 'bar' or item.get('areaStyle') is not None:
+                    entry['lower'] = np.zeros(len(values))
+        prepared.append(entry)
+    return prepared
+
+
+def _value_scale(axis: Dict, arrays: List[np.ndarray]):
+    """根据数据范围计算数值轴的(最小值, 最大值, 刻度列表)"""
+    values = np.concatenate([np.asarray(a, dtype=float).ravel() for a in arrays]) if arrays else np.array([])
+    values = values[np.isfinite(values)]
+    lo = float(values.min()) if len(values) else 0.0
+    hi = float(values.max()) if len(values) else 1.0
+    if not axis.get('scale'):
+        lo, hi = min(lo, 0.0), max(hi, 0.0)
+    if isinstance(axis.get('min'), (int, float)):
+        lo = float(axis['min'])
+    if isinstance(axis.get('max'), (int, float)):
+        hi = float(axis['max'])
+    return _nice_ticks(lo, hi)
+
+
+def _nice_ticks(lo: float, hi: float, count: int = 5):
+    """计算整齐的刻度"""
+    if hi == lo:
+        pad = abs(lo) * 0.5 or 1.0
+        lo, hi = lo - pad, hi + pad
+    raw = (hi - lo) / count
+    magnitude = 10 ** math.floor(math.log10(raw))
+    step = next(m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw)
+    start = math.floor(lo / step) * step
+    end = math.ceil(hi / step) * step
+    ticks = [start + i * step for i in range(int(round((end - start) / step)) + 1)]
+    return start, end, ticks
+
+
+# ---------- 坐标轴 ----------
+
+def _render_value_axis(scale, plot: Tuple, position: str, show_grid: bool, axis: Dict) -> Iterator[str]:
+    left, top, right, bottom = plot
+    lo, hi, ticks = scale
+    parts = []
+    for tick in ticks:
+        if position == 'x':
+            x = _project(tick, lo, hi, left, right)
+            if show_grid:
+                parts.append(f'<line x1="{x:.2f}" y1="{top:.2f}" x2="{x:.2f}" y2="{bottom:.2f}" stroke="{_GRID_COLOR}"/>')
+            parts.append(_text(x, bottom + 16, _format_number(tick), size=12, anchor='middle', color=_AXIS_COLOR))
+        else:
+            y = _project(tick, lo, hi, bottom, top)
+            if show_grid:
+                parts.append(f'<line x1="{left:.2f}" y1="{y:.2f}" x2="{right:.2f}" y2="{y:.2f}" stroke="{_GRID_COLOR}"/>')
+            if position == 'y2':
+                parts.append(_text(right + 8, y + 4, _format_number(tick), size=12, anchor='start', color=_AXIS_COLOR))
+            else:
+                parts.append(_text(left - 8, y + 4, _format_number(tick), size=12, anchor='end', color=_AXIS_COLOR))
+    parts.append(_axis_name(axis, plot, position))
+    yield '\n'.join(part for part in parts if part) + '\n'
+
+
+def _render_category_axis(categories: List, plot: Tuple, position: str, axis: Dict,
+                          positions: Optional[np.ndarray] = None) -> Iterator[str]:
+    left, top, right, bottom = plot
+    count = max(len(categories), 1)
+    parts = []
+    if position == 'x':
+        parts.append(f'<line x1="{left:.2f}" y1="{bottom:.2f}" x2="{right:.2f}" y2="{bottom:.2f}" stroke="{_AXIS_COLOR}"/>')
+        band = (right - left) / count
+        max_width = max((_text_width(_short(label), 12) for label in categories), default=0) + 8
+        step = max(1, math.ceil(count * max_width / max(right - left, 1)))
+        for index in range(0, len(categories), step):
+            x = positions[index] if positions is not None else left + (index + 0.5) * band
+            parts.append(_text(x, bottom + 16, _short(categories[index]), size=12, anchor='middle', color=_AXIS_COLOR))
+    else:
+        parts.append(f'<line x1="{left:.2f}" y1="{top:.2f}" x2="{left:.2f}" y2="{bottom:.2f}" stroke="{_AXIS_COLOR}"/>')
+        band = (bottom - top) / count
+        step = max(1, math.ceil(count * 16 / max(bottom - top, 1)))
+        for index in range(0, len(categories), step):
+            y = bottom - (index + 0.5) * band
+            parts.append(_text(left - 8, y + 4, _short(categories[index]), size=12, anchor='end', color=_AXIS_COLOR))
+    parts.append(_axis_name(axis, plot, position))
+    yield '\n'.join(part for part in parts if part) + '\n'
+
+
+def _axis_name(axis: Dict, plot: Tuple, position: str) -> str:
+    name = axis.get('name') if isinstance(axis, dict) else None
+    if not name:
+        return ''
+    left, top, right, bottom = plot
+    if position == 'x':
+        return _text((left + right) / 2, bottom + 36, name, size=12, anchor='middle', color=_AXIS_COLOR)
+    if position == 'y2':
+        return _text(right, top - 8, name, size=12, anchor='end', color=_AXIS_COLOR)
+    return _text(left, top - 8, name, size=12, anchor='start', color=_AXIS_COLOR)
+
+
+# ---------- 系列 ----------
+
+def _render_bars(entry: Dict, scale, plot: Tuple, positions: np.ndarray, band: float, groups: List,
+                 horizontal: bool, color: str) -> Iterator[str]:
+    left, top, right, bottom = plot
+    lo, hi, _ = scale
+    slots = max(len(groups), 1)
+    bar_width = entry['series'].get('barWidth')
+    if isinstance(bar_width, str) and bar_width.endswith('%'):
+        slot_width = band * float(bar_width[:-1]) / 100 / slots
+    elif isinstance(bar_width, (int, float)):
+        slot_width = float(bar_width)
+    else:
+        slot_width = band * 0.8 / slots
+    thickness = slot_width * (0.9 if slots > 1 else 1.0)
+    offset = (groups.index(entry['group']) - (slots - 1) / 2) * slot_width
+
+    upper = entry['upper']
+    lower = entry['lower'] if entry['lower'] is not None else np.zeros(len(upper))
+    count = min(len(upper), len(positions))
+    if horizontal:
+        a = _project(lower[:count], lo, hi, left, right)
+        b = _project(upper[:count], lo, hi, left, right)
+    else:
+        a = _project(lower[:count], lo, hi, bottom, top)
+        b = _project(upper[:count], lo, hi, bottom, top)
+
+    yield f'<g class="series bar" fill="{_attr(color)}">\n'
+    for start in range(0, count, _POINTS_PER_CHUNK):
+        parts = []
+        for i in range(start, min(start + _POINTS_PER_CHUNK, count)):
+            if not (np.isfinite(a[i]) and np.isfinite(b[i])) or a[i] == b[i]:
+                continue
+            center = positions[i] + (offset if not horizontal else -offset)
+            low, high = min(a[i], b[i]), max(a[i], b[i])
+            if horizontal:
+                parts.append(f'<rect x="{low:.2f}" y="{center - thickness / 2:.2f}" width="{high - low:.2f}" height="{thickness:.2f}"/>')
+            else:
+                parts.append(f'<rect x="{center - thickness / 2:.2f}" y="{low:.2f}" width="{thickness:.2f}" height="{high - low:.2f}"/>')
+        if parts:
+            yield '\n'.join(parts) + '\n'
+    yield '</g>\n'
+
+
+def _render_line(entry: Dict, scale, plot: Tuple, positions: np.ndarray, color: str) -> Iterator[str]:
+    left, top, right, bottom = plot
+    lo, hi, _ = scale
+    upper = entry['upper']
+    count = min(len(upper), len(positions))
+    xs = positions[:count]
+    ys = _project(upper[:count], lo, hi, bottom, top)
+    area_style = entry['series'].get('areaStyle')
+
+    yield '<g class="series line">\n'
+    for run in _finite_runs(ys):
+        if area_style is not None:
+            if entry['lower'] is not None:
+                base = _project(entry['lower'][:count], lo, hi, bottom, top)[run]
+            else:
+                base = np.full(len(run), _project(min(max(0.0, lo), hi), lo, hi, bottom, top))
+            opacity = area_style.get('opacity', 0.7) if isinstance(area_style, dict) else 0.7
+            yield f'<path fill="{_attr(color)}" fill-opacity="{opacity}" stroke="none" d="'
+            yield from _path_segments(xs[run], ys[run])
+            yield from _path_segments(xs[run][::-1], base[::-1], move=False)
+            yield 'Z"/>\n'
+        yield f'<path fill="none" stroke="{_attr(color)}" stroke-width="2" stroke-linejoin="round" d="'
+        yield from _path_segments(xs[run], ys[run])
+        yield '"/>\n'
+    yield '</g>\n'
+
+
+def _render_scatter(entry: Dict, value_axes: List, plot: Tuple, color: str, value_x: bool,
+                    positions: Optional[np.ndarray]) -> Iterator[str]:
+    left, top, right, bottom = plot
+    size = entry['series'].get('symbolSize', 8)
+    size = size if isinstance(size, (int, float)) else 8
+    radii = np.full(len(entry['upper']), size / 2)
+    if entry.get('sizes') is not None:
+        radii = np.where(np.isfinite(entry['sizes']), entry['sizes'] / 2, radii)
+    ys_scale = value_axes[1] if value_x else value_axes[entry['axis']]
+    ys = _project(entry['upper'], ys_scale[0], ys_scale[1], bottom, top)
+    if value_x:
+        xs = _project(entry['x'], value_axes[0][0], value_axes[0][1], left, right)
+    else:
+        # 类目轴上的散点（如箱线图异常值），x为类目下标
+        index = np.nan_to_num(entry['x'] if entry['x'] is not None else np.arange(len(ys)), nan=-1).astype(int)
+        valid = (index >= 0) & (index < len(positions))
+        xs = np.full(len(ys), np.nan)
+        xs[valid] = positions[index[valid]]
+
+    yield f'<g class="series scatter" fill="{_attr(color)}" fill-opacity="0.8">\n'
+    for start in range(0, len(ys), _POINTS_PER_CHUNK):
+        stop = start + _POINTS_PER_CHUNK
+        parts = [
+            f'<circle cx="{x:.2f}" cy="{y:.2f}" r="{radius:g}"/>'
+            for x, y, radius in zip(xs[start:stop], ys[start:stop], radii[start:stop])
+            if math.isfinite(x) and math.isfinite(y)
+        ]
+        if parts:
+            yield '\n'.join(parts) + '\n'
+    yield '</g>\n'
+
+
+def _render_boxplot(entry: Dict, scale, plot: Tuple, positions: np.ndarray, band: float, color: str) -> Iterator[str]:
+    left, top, right, bottom = plot
+    lo, hi, _ = scale
+    width = band * 0.5
+    yield f'<g class="series boxplot" fill="#fff" stroke="{_attr(color)}" stroke-width="1.5">\n'
+    for box, x in zip(entry['boxes'], positions):
+        if not np.all(np.isfinite(box)):
+            continue
+        low, q1, median, q3, high = _project(box, lo, hi, bottom, top)
+        yield (f'<line x1="{x:.2f}" y1="{low:.2f}" x2="{x:.2f}" y2="{q1:.2f}"/>'
+               f'<line x1="{x:.2f}" y1="{q3:.2f}" x2="{x:.2f}" y2="{high:.2f}"/>'
+               f'<line x1="{x - width / 4:.2f}" y1="{low:.2f}" x2="{x + width / 4:.2f}" y2="{low:.2f}"/>'
+               f'<line x1="{x - width / 4:.2f}" y1="{high:.2f}" x2="{x + width / 4:.2f}" y2="{high:.2f}"/>'
+               f'<rect x="{x - width / 2:.2f}" y="{q3:.2f}" width="{width:.2f}" height="{q1 - q3:.2f}"/>'
+               f'<line x1="{x - width / 2:.2f}" y1="{median:.2f}" x2="{x + width / 2:.2f}" y2="{median:.2f}"/>\n')
+    yield '</g>\n'
+
+
+# ---------- 图例 ----------
+
+def _layout_legend(items: List[Tuple[str, str]], max_width: float) -> List[List[Tuple[str, str, float]]]:
+    rows = [[]]
+    row_width = 0.0
+    for name, color in items:
+        item_width = 25 + _text_width(_short(name), 12) + 10
+        if rows[-1] and row_width + item_width > max_width:
+            rows.append([])
+            row_width = 0.0
+        rows[-1].append((name, color, item_width))
+        row_width += item_width
+    return rows
+
+
+def _render_legend(rows: List, width: int, top: float) -> Iterator[str]:
+    yield '<g class="legend">\n'
+    for row_index, row in enumerate(rows):
+        row_width = sum(item[2] for item in row)
+        x = (width - row_width) / 2
+        y = top + row_index * 20
+        for name, color, item_width in row:
+            legend_color = _GRID_COLOR if color in (None, 'transparent') else color
+            yield f'<rect x="{x:.2f}" y="{y + 2:.2f}" width="20" height="12" rx="3" fill="{_attr(legend_color)}"/>'
+            yield _text(x + 25, y + 12, _short(name), size=12) + '\n'
+            x += item_width
+    yield '</g>\n'
+
+
+# ---------- 工具函数 ----------
+
+def _path_segments(xs: np.ndarray, ys: np.ndarray, move: bool = True) -> Iterator[str]:
+    """按片段输出路径命令，避免一次性拼接超长字符串"""
+    for start in range(0, len(xs), _POINTS_PER_CHUNK):
+        commands = [
+            f'L{x:.2f},{y:.2f}'
+            for x, y in zip(xs[start:start + _POINTS_PER_CHUNK], ys[start:start + _POINTS_PER_CHUNK])
+        ]
+        if start == 0 and move and commands:
+            commands[0] = 'M' + commands[0][1:]
+        yield ''.join(commands)
+
+
+def _finite_runs(values: np.ndarray) -> List[np.ndarray]:
+    """返回连续有效值的下标区间（空值处断开折线）"""
+    valid = np.isfinite(values)
+    if not valid.any():
+        return []
+    indices = np.flatnonzero(valid)
+    breaks = np.flatnonzero(np.diff(indices) > 1) + 1
+    return np.split(indices, breaks)
+
+
+def _project(value, lo: float, hi: float, start: float, end: float):
+    """将数值线性映射到像素坐标"""
+    span = (hi - lo) or 1.0
+    return start + (np.asarray(value, dtype=float) - lo) / span * (end - start)
+
+
+def _sector_path(cx: float, cy: float, inner: float, outer: float, start: float, end: float) -> str:
+    """扇形（或环形扇区）路径"""
+    if end - start >= 2 * math.pi - 1e-6:
+        # 完整圆环需拆成两段圆弧
+        mid = start + math.pi
+        return _sector_path(cx, cy, inner, outer, start, mid) + ' ' + _sector_path(cx, cy, inner, outer, mid, end - 1e-6)
+    large = 1 if end - start > math.pi else 0
+    x1, y1 = cx + outer * math.cos(start), cy + outer * math.sin(start)
+    x2, y2 = cx + outer * math.cos(end), cy + outer * math.sin(end)
+    path = f'M{x1:.2f},{y1:.2f} A{outer:.2f},{outer:.2f} 0 {large} 1 {x2:.2f},{y2:.2f}'
+    if inner > 0:
+        x3, y3 = cx + inner * math.cos(end), cy + inner * math.sin(end)
+        x4, y4 = cx + inner * math.cos(start), cy + inner * math.sin(start)
+        return path + f' L{x3:.2f},{y3:.2f} A{inner:.2f},{inner:.2f} 0 {large} 0 {x4:.2f},{y4:.2f} Z'
+    return path + f' L{cx:.2f},{cy:.2f} Z'
+
+
+def _gradient_color(value: float, vmin: float, vmax: float) -> str:
+    """按视觉映射区间插值颜色"""
+    ratio = 0.0 if vmax == vmin else min(max((value - vmin) / (vmax - vmin), 0.0), 1.0)
+    position = ratio * (len(_VISUAL_MAP_COLORS) - 1)
+    index = min(int(position), len(_VISUAL_MAP_COLORS) - 2)
+    a = _hex_to_rgb(_VISUAL_MAP_COLORS[index])
+    b = _hex_to_rgb(_VISUAL_MAP_COLORS[index + 1])
+    t = position - index
+    return '#' + ''.join(f'{round(ca + (cb - ca) * t):02x}' for ca, cb in zip(a, b))
+
+
+def _hex_to_rgb(color: str) -> Tuple[int, int, int]:
+    color = color.lstrip('#')
+    return tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def _first_axis(axis: Any) -> Dict:
+    if isinstance(axis, list):
+        axis = axis[0] if axis else {}
+    return axis if isinstance(axis, dict) else {}
+
+
+def _series_color(item: Dict, index: int, colors: List[str]) -> str:
+    style = item.get('itemStyle') if isinstance(item.get('itemStyle'), dict) else {}
+    color = style.get('color')
+    return color if isinstance(color, str) else colors[index % len(colors)]
+
+
+def _item_color(point: Any, default: str) -> str:
+    if isinstance(point, dict) and isinstance(point.get('itemStyle'), dict):
+        color = point['itemStyle'].get('color')
+        if isinstance(color, str):
+            return color
+    return default
+
+
+def _item_value(point: Any) -> Any:
+    return point.get('value') if isinstance(point, dict) else point
+
+
+def _item_name(point: Any, index: int) -> str:
+    if isinstance(point, dict) and point.get('name') is not None:
+        return str(point['name'])
+    return f'数据{index + 1}'
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value) if value is not None and not isinstance(value, bool) else float('nan')
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def _to_float_array(values: List) -> np.ndarray:
+    return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=float)
+
+
+def _percent(value: Any, size: float) -> float:
+    """解析百分比或像素值"""
+    if isinstance(value, str) and value.endswith('%'):
+        return float(value[:-1]) / 100 * size
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _format_number(value: float) -> str:
+    value = round(float(value), 10)
+    if abs(value) >= 1e6 or (0 < abs(value) < 1e-4):
+        return f'{value:.3g}'
+    return f'{value:,.10g}'
+
+
+def _text_width(text: str, size: int) -> float:
+    """估算文本宽度（全角字符按字号计，其余按0.6倍字号计）"""
+    return sum(size if ord(char) > 255 else size * 0.6 for char in text)
+
+
+def _short(value: Any, limit: int = 14) -> str:
+    text = '' if value is None else str(value)
+    return text if len(text) <= limit else text[:limit - 1] + '…'
+
+
+def _attr(value: Any) -> str:
+    return escape(str(value), {'"': '&quot;'})
+
+
+def _text(x: float, y: float, content: Any, size: int = 12, anchor: str = 'start', color: str = _TEXT_COLOR,
+          weight: str = None) -> str:
+    weight_attr = f' font-weight="{weight}"' if weight else ''
+    return (f'<text x="{x:.2f}" y="{y:.2f}" font-size="{size}" text-anchor="{anchor}" '
+            f'fill="{color}"{weight_attr}>{escape(str(content))}</text>')
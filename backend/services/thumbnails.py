@@ -0,0 +1,95 @@
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from .chart_generator import ChartGenerator
+from .render_pool import RenderPool, RenderQueueFullError, RenderTimeoutError
+from .svg_renderer import SVGRenderer
+
+logger = logging.getLogger(__name__)
+
+# 缩略图支持的格式及MIME类型
+THUMBNAIL_FORMATS = {
+    'svg': 'image/svg+xml',
+    'png': 'image/png'
+}
+
+
+class ThumbnailService:
+    """
+    推荐图表的缩略图
+
+    - 图表配置按缩略图尺寸生成：折线按像素宽度降采样、散点按网格抽稀、饼图/漏斗图只保留前几个类别
+    - 不显示标题和图例，SVG由SVGRenderer生成，光栅化依赖可用时同时生成PNG
+    - 缩略图以任务形式保存在数据集中，同一图表并发请求共享同一次生成，数据集淘汰时一并释放
+    """
+
+    def __init__(self, chart_generator: ChartGenerator, render_pool: RenderPool,
+                 width: int = 320, height: int = 200, top_n: int = 8):
+        self.chart_generator = chart_generator
+        self.render_pool = render_pool
+        self.svg_renderer = SVGRenderer()
+        self.width = width
+        self.height = height
+        # 按一半像素尺寸采样数据，缩略图上的细节已不可分辨
+        self.options = {
+            'width': width // 2,
+            'height': height // 2,
+            'topN': top_n,
+            'downsample': 'lttb',
+            'legendPosition': 'none'
+        }
+
+    def schedule(self, dataset: Dict, chart_type: str) -> asyncio.Task:
+        """
+        获取数据集中某个图表的缩略图任务，不存在或上次生成失败时新建
+
+        Args:
+            dataset: DatasetStore中的数据集
+            chart_type: 图表类型
+
+        Returns:
+            结果为{格式: 内容}的任务，生成失败时结果为None
+        """
+        # 只为支持的图表类型建任务，避免任意名称使缓存无限增长
+        if chart_type not in self.chart_generator.supported_charts:
+            raise ValueError(f"不支持的图表类型: {chart_type}")
+
+        tasks = dataset["thumbnails"]
+        task = tasks.get(chart_type)
+        if task is None or (task.done() and (task.cancelled() or task.result() is None)):
+            task = asyncio.create_task(self._generate(dataset, chart_type))
+            tasks[chart_type] = task
+        return task
+
+    async def _generate(self, dataset: Dict, chart_type: str) -> Optional[Dict[str, bytes]]:
+        try:
+            loop = asyncio.get_running_loop()
+            svg = await loop.run_in_executor(None, lambda: self._render_svg(dataset, chart_type))
+            thumbnails = {'svg': svg}
+
+            if self.render_pool.available:
+                try:
+                    thumbnails['png'] = await self.render_pool.render_png(
+                        svg=svg, width=self.width, height=self.height, dpi=96
+                    )
+                except (RenderQueueFullError, RenderTimeoutError) as e:
+                    # PNG缩略图在下次请求时重新生成
+                    logger.warning(f"{chart_type}缩略图PNG渲染失败: {str(e)}")
+                    return None
+
+            return thumbnails
+
+        except Exception as e:
+            logger.error(f"生成{chart_type}缩略图失败: {str(e)}")
+            return None
+
+    def _render_svg(self, dataset: Dict, chart_type: str) -> bytes:
+        config = self.chart_generator.generate_config(
+            chart_type,
+            dataset["df"],
+            dataset["columns"],
+            self.options,
+            dataset_key=dataset["id"]
+        )
+        return self.svg_renderer.render(config, self.width, self.height)
@@ -0,0 +1,64 @@
+import asyncio
+
+import pandas as pd
+
+from backend.services.ai_analyzer import AIAnalyzer
+
+COLUMNS = [
+    {"name": "日期", "type": "date"},
+    {"name": "销售额", "type": "number"}
+]
+
+MODEL_OUTPUT = [
+    {"chart": "折线图", "reason": "趋势", "score": 0.7},
+    {"chart": "折线图", "reason": "重复", "score": 0.99},
+    {"chart": "不存在的图表", "reason": "无效", "score": 0.9},
+    {"chart": "面积图", "reason": "累计", "score": 0.8},
+    {"chart": "柱状图", "reason": "对比", "score": 0.75},
+    {"chart": "雷达图", "reason": "多余", "score": 0.95}
+]
+
+
+def _analyzer(closed: list) -> AIAnalyzer:
+    analyzer = AIAnalyzer()
+
+    async def fake_stream(prompt):
+        try:
+            for rec in MODEL_OUTPUT:
+                yield dict(rec)
+        finally:
+            closed.append(True)
+
+    async def fake_call(prompt):
+        return [dict(rec) for rec in MODEL_OUTPUT]
+
+    analyzer._stream_deepseek_api = fake_stream
+    analyzer._call_deepseek_api = fake_call
+    return analyzer
+
+
+async def _collect(analyzer: AIAnalyzer, df: pd.DataFrame):
+    return [rec async for rec in analyzer.stream_recommendations(df, COLUMNS)]
+
+
+def test_stream_closes_api_stream_after_three_recommendations():
+    closed = []
+
+    async def run():
+        streamed = await _collect(_analyzer(closed), pd.DataFrame(columns=["日期", "销售额"]))
+        # 在事件循环结束前API流就已关闭
+        return streamed, list(closed)
+
+    streamed, closed_before_shutdown = asyncio.run(run())
+
+    assert [rec["chart"] for rec in streamed] == ["折线图", "面积图", "柱状图"]
+    assert closed_before_shutdown == [True]
+
+
+def test_stream_and_batch_select_the_same_recommendations():
+    df = pd.DataFrame(columns=["日期", "销售额"])
+    streamed = asyncio.run(_collect(_analyzer([]), df))
+    batch = asyncio.run(_analyzer([]).recommend_charts(df, COLUMNS))
+
+    by_score = sorted(streamed, key=lambda x: x["score"], reverse=True)
+    assert batch == by_score
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from backend.services.chart_generator import ChartGenerator
+
+BUBBLE_COLUMNS = [
+    {"name": "x", "type": "number"},
+    {"name": "y", "type": "number"},
+    {"name": "size", "type": "number"}
+]
+
+
+def _bubble_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "x": rng.random(rows),
+        "y": rng.random(rows),
+        "size": rng.random(rows) * 100
+    })
+
+
+def test_bubble_chart_is_thinned_by_default():
+    df = _bubble_frame(50000)
+    options = {"width": 800, "height": 600, "maxBubbleSize": 40}
+    config = ChartGenerator().generate_config("泡泡图", df, BUBBLE_COLUMNS, options)
+
+    points = config["series"][0]["data"]
+    # 网格边长为半个最大气泡：(800 // 20) * (600 // 20)
+    assert len(points) <= 40 * 30
+    # 最大的气泡所在网格保留的正是它本身
+    assert max(point["value"][2] for point in points) == df["size"].max()
+
+
+def test_bubble_chart_thinning_can_be_disabled():
+    df = _bubble_frame(5000)
+    config = ChartGenerator().generate_config("泡泡图", df, BUBBLE_COLUMNS, {"downsample": "none"})
+
+    assert len(config["series"][0]["data"]) == len(df)
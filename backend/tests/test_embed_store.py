@@ -0,0 +1,28 @@
+import gzip
+
+from backend.services.embed_store import EmbedStore
+from backend.services.serialization import loads
+
+
+def _config(i: int) -> dict:
+    return {"title": {"text": f"图表{i}"}, "series": [{"type": "bar", "data": [i]}]}
+
+
+def test_persistent_embeds_are_never_evicted(tmp_path):
+    store = EmbedStore(max_entries=2, disk_dir=str(tmp_path))
+    embed_ids = [store.add(_config(i)) for i in range(20)]
+
+    assert store.persistent
+    # 新实例（相当于服务重启）仍能读取全部嵌入
+    reopened = EmbedStore(max_entries=2, disk_dir=str(tmp_path))
+    for i, embed_id in enumerate(embed_ids):
+        assert loads(gzip.decompress(reopened.get_compressed(embed_id))) == _config(i)
+
+
+def test_memory_only_embeds_are_not_persistent():
+    store = EmbedStore(max_entries=2)
+    embed_ids = [store.add(_config(i)) for i in range(3)]
+
+    assert not store.persistent
+    assert store.get_compressed(embed_ids[0]) is None
+    assert store.get_compressed("../../etc/passwd") is None
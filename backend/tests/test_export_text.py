@@ -0,0 +1,46 @@
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from backend.main import app, dataset_store
+
+
+def _date_dataset() -> str:
+    df = pd.DataFrame({
+        "日期": pd.date_range("2024-01-01", periods=30, freq="D"),
+        "销售额": range(30)
+    })
+    columns = [
+        {"name": "日期", "type": "date"},
+        {"name": "销售额", "type": "number"}
+    ]
+    return dataset_store.add(df, columns, {"rows": len(df)})
+
+
+def _export(client: TestClient, dataset_id: str, format_type: str, **options):
+    return client.post("/export", json={
+        "dataset_id": dataset_id,
+        "chart_type": "折线图",
+        "format": format_type,
+        "options": {"format": format_type, **options}
+    })
+
+
+def test_inline_iframe_export_with_date_column():
+    dataset_id = _date_dataset()
+    with TestClient(app) as client:
+        response = _export(client, dataset_id, "iframe", embed_mode="inline")
+
+    assert response.status_code == 200
+    assert response.text.startswith("<iframe")
+    assert "2024-01-01" in response.text
+
+
+def test_markdown_export_with_date_column():
+    dataset_id = _date_dataset()
+    with TestClient(app) as client:
+        response = _export(client, dataset_id, "markdown")
+
+    assert response.status_code == 200
+    assert "```json" in response.text
+    assert "2024-01-01" in response.text
+    assert "生成时间: " in response.text
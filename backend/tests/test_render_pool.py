@@ -0,0 +1,60 @@
+import asyncio
+import sys
+import time
+
+import pytest
+
+from backend.services.render_pool import RenderPool, RenderTimeoutError
+
+# 假的cairosvg：SVG中含有SLOW时卡住，否则立即返回
+FAKE_CAIROSVG = '''
+import time
+
+
+def svg2png(bytestring, output_width, output_height):
+    if b"SLOW" in bytestring:
+        time.sleep(60)
+    return b"PNG"
+'''
+
+SLOW_SVG = b'<svg xmlns="http://www.w3.org/2000/svg">SLOW</svg>'
+FAST_SVG = b'<svg xmlns="http://www.w3.org/2000/svg"></svg>'
+
+
+@pytest.fixture
+def fake_cairosvg(tmp_path, monkeypatch):
+    (tmp_path / "cairosvg.py").write_text(FAKE_CAIROSVG)
+    # spawn启动的工作进程沿用父进程的sys.path
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "cairosvg", raising=False)
+
+
+def test_retry_after_broken_pool_keeps_the_original_deadline(fake_cairosvg):
+    job_timeout = 4.0
+
+    async def run():
+        pool = RenderPool(max_workers=2, job_timeout=60)
+        try:
+            # 预热工作进程，避免进程启动时间计入超时
+            assert await pool.render_png(svg=FAST_SVG) == b"PNG"
+            pool.job_timeout = job_timeout
+
+            async def timed_slow_render():
+                started = time.perf_counter()
+                with pytest.raises(RenderTimeoutError):
+                    await pool.render_png(svg=SLOW_SVG)
+                return time.perf_counter() - started
+
+            first = asyncio.create_task(timed_slow_render())
+            await asyncio.sleep(job_timeout / 2)
+            # 第一个任务超时重建进程池时，第二个任务因进程池失效而重试
+            second = await timed_slow_render()
+            await first
+            return second, pool.retries
+        finally:
+            pool.shutdown()
+
+    elapsed, retries = asyncio.run(run())
+
+    assert retries == 1
+    assert elapsed < job_timeout + 1.0
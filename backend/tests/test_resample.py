@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+
+from backend.services.data_processor import DataProcessor
+
+COLUMNS = [
+    {"name": "日期", "type": "date"},
+    {"name": "地区", "type": "string"},
+    {"name": "销售额", "type": "number"}
+]
+
+
+@pytest.fixture
+def df() -> pd.DataFrame:
+    return pd.DataFrame({
+        "日期": pd.date_range("2024-01-01", periods=60, freq="D"),
+        "地区": ["华东", "华北", "华南"] * 20,
+        "销售额": range(60)
+    })
+
+
+def test_resample_rejects_numeric_aggregation_on_text_column(df):
+    with pytest.raises(ValueError, match="非数值列"):
+        DataProcessor().resample_time_series(df, COLUMNS, "month", aggregations={"地区": "sum"})
+
+
+def test_resample_rejects_date_column_as_aggregation(df):
+    with pytest.raises(ValueError, match="日期列"):
+        DataProcessor().resample_time_series(df, COLUMNS, "month", aggregations={"日期": "count"})
+
+
+def test_resample_allows_count_first_last_on_text_column(df):
+    resampled, columns = DataProcessor().resample_time_series(
+        df, COLUMNS, "month", aggregations={"地区": "last", "销售额": "sum"}
+    )
+
+    assert len(resampled) == 2
+    assert resampled["销售额"].tolist() == [sum(range(31)), sum(range(31, 60))]
+    assert [col["type"] for col in columns] == ["date", "string", "number"]
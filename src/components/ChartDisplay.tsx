@@ -1,7 +1,8 @@
-import React, { useState, useRef } from 'react'
+import React, { useState, useRef, useEffect } from 'react'
 import ReactECharts from 'echarts-for-react'
 import { ChartData, ChartRecommendation } from '../types'
 import { generateChartConfig } from '../utils/chartConfig'
+import { subscribeRecommendations } from '../services/api'
 import { Palette, Settings, RotateCcw } from 'lucide-react'
 
 interface ChartDisplayProps {
@@ -9,13 +10,35 @@ interface ChartDisplayProps {
 }
 
 const ChartDisplay: React.FC<ChartDisplayProps> = ({ chartData }) => {
-  const [selectedChart, setSelectedChart] = useState<ChartRecommendation>(
+  const [recommendations, setRecommendations] = useState<ChartRecommendation[]>(chartData.recommendations)
+  const [selectedChart, setSelectedChart] = useState<ChartRecommendation | undefined>(
     chartData.selectedChart || chartData.recommendations[0]
   )
+  const [recommendationError, setRecommendationError] = useState<string | null>(null)
   const [customConfig, setCustomConfig] = useState<any>({})
   const chartRef = useRef<ReactECharts>(null)
 
-  const chartConfig = generateChartConfig(selectedChart.chart, chartData.data, chartData.columns, customConfig)
+  // 上传接口立即返回数据，推荐结果在后台生成后逐个推送
+  useEffect(() => {
+    const job = chartData.recommendation_job
+    if (!job || chartData.recommendations.length > 0) return
+
+    return subscribeRecommendations(job, {
+      onRecommendation: (recommendation) => {
+        setRecommendations(prev => [...prev, recommendation])
+        setSelectedChart(prev => prev || recommendation)
+      },
+      onDone: (result) => {
+        setRecommendations(result.recommendations)
+        setSelectedChart(prev => prev || result.recommendations[0])
+      },
+      onError: (message) => setRecommendationError(message)
+    })
+  }, [chartData])
+
+  const chartConfig = selectedChart
+    ? generateChartConfig(selectedChart.chart, chartData.data, chartData.columns, customConfig)
+    : null
 
   const handleChartSelect = (chart: ChartRecommendation) => {
     setSelectedChart(chart)
@@ -34,16 +57,22 @@ const ChartDisplay: React.FC<ChartDisplayProps> = ({ chartData }) => {
       {/* 图表推荐选择 */}
       <div className="bg-white dark:bg-gray-800 rounded-lg shadow p-6">
         <h3 className="text-lg font-semibold text-gray-900 dark:text-white mb-4">
-          AI推荐图表 (共{chartData.recommendations.length}种)
+          AI推荐图表 (共{recommendations.length}种)
         </h3>
         
+        {recommendations.length === 0 && (
+          <p className="text-sm text-gray-500 dark:text-gray-400">
+            {recommendationError ? `图表推荐失败: ${recommendationError}` : '正在生成AI图表推荐...'}
+          </p>
+        )}
+        
         <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
-          {chartData.recommendations.map((chart, index) => (
+          {recommendations.map((chart, index) => (
             <div
               key={index}
               onClick={() => handleChartSelect(chart)}
               className={`p-4 border-2 rounded-lg cursor-pointer transition-all ${
-                selectedChart.chart === chart.chart
+                selectedChart?.chart === chart.chart
                   ? 'border-blue-500 bg-blue-50 dark:bg-blue-900/20'
                   : 'border-gray-200 dark:border-gray-600 hover:border-blue-300'
               }`}
@@ -67,7 +96,7 @@ const ChartDisplay: React.FC<ChartDisplayProps> = ({ chartData }) => {
           <div className="bg-white dark:bg-gray-800 rounded-lg shadow p-6">
             <div className="flex items-center justify-between mb-4">
               <h3 className="text-lg font-semibold text-gray-900 dark:text-white">
-                {selectedChart.chart}
+                {selectedChart?.chart || '图表'}
               </h3>
               <div className="flex items-center space-x-2">
                 <button
@@ -81,12 +110,18 @@ const ChartDisplay: React.FC<ChartDisplayProps> = ({ chartData }) => {
             </div>
             
             <div className="h-96">
-              <ReactECharts
-                ref={chartRef}
-                option={chartConfig}
-                style={{ height: '100%', width: '100%' }}
-                opts={{ renderer: 'canvas' }}
-              />
+              {chartConfig ? (
+                <ReactECharts
+                  ref={chartRef}
+                  option={chartConfig}
+                  style={{ height: '100%', width: '100%' }}
+                  opts={{ renderer: 'canvas' }}
+                />
+              ) : (
+                <div className="h-full flex items-center justify-center text-gray-500 dark:text-gray-400">
+                  {recommendationError ? '暂无可显示的图表' : '等待图表推荐...'}
+                </div>
+              )}
             </div>
           </div>
         </div>
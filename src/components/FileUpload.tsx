@@ -21,13 +21,14 @@ const FileUpload: React.FC<FileUploadProps> = ({ onFileUploaded, onProcessingUpd
     try {
       onProcessingUpdate('uploading', '正在上传文件...')
       
-      // 模拟处理步骤
-      setTimeout(() => onProcessingUpdate('analyzing', '正在分析表头结构...'), 1000)
-      setTimeout(() => onProcessingUpdate('cleaning', '正在清洗数据...'), 3000)
-      setTimeout(() => onProcessingUpdate('recommending', '正在推荐图表类型...'), 5000)
-      setTimeout(() => onProcessingUpdate('generating', '正在生成图表...'), 7000)
+      // 模拟处理步骤（上传完成后不再更新，图表推荐在结果页加载）
+      const timers = [
+        setTimeout(() => onProcessingUpdate('analyzing', '正在分析表头结构...'), 1000),
+        setTimeout(() => onProcessingUpdate('cleaning', '正在清洗数据...'), 3000)
+      ]
 
       const result = await uploadFile(file)
+      timers.forEach(clearTimeout)
       
       if (result.success && result.data) {
         onFileUploaded(result.data)
@@ -1,5 +1,5 @@
 import axios from 'axios'
-import { FileUploadResponse, ChartData, ExportOptions } from '../types'
+import { FileUploadResponse, ChartData, ChartRecommendation, ExportOptions, RecommendationJob } from '../types'
 
 const API_BASE_URL = '/api'
 
@@ -44,9 +44,12 @@ export const uploadFile = async (file: File): Promise<FileUploadResponse> => {
       },
     })
 
+    // 图表推荐在后台进行，由图表组件通过recommendation_job单独加载
+    const data: ChartData = response.data
+
     return {
       success: true,
-      data: response.data
+      data
     }
   } catch (error: any) {
     return {
@@ -56,6 +59,100 @@ export const uploadFile = async (file: File): Promise<FileUploadResponse> => {
   }
 }
 
+interface RecommendationHandlers {
+  onRecommendation: (recommendation: ChartRecommendation) => void
+  onDone: (job: RecommendationJob) => void
+  onError: (message: string) => void
+}
+
+/**
+ * 订阅后台图表推荐任务，优先使用SSE，不支持或连接失败时改为有限次数的轮询
+ *
+ * 返回取消订阅的函数
+ */
+export const subscribeRecommendations = (
+  job: RecommendationJob,
+  handlers: RecommendationHandlers
+): (() => void) => {
+  let cancelled = false
+  let finished = false
+  let source: EventSource | null = null
+
+  const finish = () => {
+    finished = true
+    source?.close()
+  }
+
+  const poll = () => {
+    if (!job.poll_url) {
+      handlers.onError('无法获取图表推荐')
+      return
+    }
+    waitForRecommendations(job.poll_url, () => cancelled)
+      .then(result => {
+        if (!cancelled) handlers.onDone(result)
+      })
+      .catch(error => {
+        if (!cancelled) handlers.onError(error.message || '图表推荐失败')
+      })
+  }
+
+  if (job.stream_url && typeof EventSource !== 'undefined') {
+    source = new EventSource(`${API_BASE_URL}${job.stream_url}`)
+    source.addEventListener('recommendation', (event) => {
+      handlers.onRecommendation(JSON.parse((event as MessageEvent).data))
+    })
+    source.addEventListener('done', (event) => {
+      finish()
+      handlers.onDone(JSON.parse((event as MessageEvent).data))
+    })
+    source.addEventListener('error', (event) => {
+      const data = (event as MessageEvent).data
+      if (data) {
+        // 服务端推送的error事件
+        finish()
+        handlers.onError(JSON.parse(data).error || '图表推荐失败')
+      } else if (!finished && !cancelled) {
+        // 连接失败，改为轮询
+        finish()
+        poll()
+      }
+    })
+  } else {
+    poll()
+  }
+
+  return () => {
+    cancelled = true
+    source?.close()
+  }
+}
+
+/**
+ * 轮询后台图表推荐任务直到完成，超过最大次数或被取消时失败
+ */
+export const waitForRecommendations = async (
+  pollUrl: string,
+  isCancelled: () => boolean = () => false,
+  interval: number = 1000,
+  maxAttempts: number = 120
+): Promise<RecommendationJob> => {
+  for (let attempt = 0; attempt < maxAttempts && !isCancelled(); attempt++) {
+    const response = await api.get(pollUrl)
+    const job: RecommendationJob = response.data
+
+    if (job.status === 'completed') {
+      return job
+    }
+    if (job.status === 'failed') {
+      throw new Error(job.error || '图表推荐失败')
+    }
+
+    await new Promise(resolve => setTimeout(resolve, interval))
+  }
+  throw new Error(isCancelled() ? '已取消' : '图表推荐超时')
+}
+
 /**
  * 导出图表
  */
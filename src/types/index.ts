@@ -20,10 +20,21 @@ export interface ChartRecommendation {
   config?: any
 }
 
+export interface RecommendationJob {
+  id: string
+  status: 'pending' | 'running' | 'completed' | 'failed'
+  recommendations: ChartRecommendation[]
+  error?: string
+  poll_url?: string
+  stream_url?: string
+}
+
 export interface ChartData {
   recommendations: ChartRecommendation[]
   data: any[]
   columns: ColumnInfo[]
+  dataset_id?: string
+  recommendation_job?: RecommendationJob
   selectedChart?: ChartRecommendation
   chartConfig?: any
 }